@@ -2,13 +2,16 @@
 
 # ==== CHECK USAGE ====
 if [ "$#" -lt 2 ]; then
-    echo "Usage: $0 <FILES_DIR> <SCRIPTS_DIR>"
+    echo "Usage: $0 <FILES_DIR> <SCRIPTS_DIR> [<PEPTIDE_LEN_MIN>]"
     exit 1
 fi
 
 # ==== ARGUMENTS ====
 FILES_DIR=$1  # Main directory path
 SCRIPTS_DIR=$2  # Scripts directory
+PEPTIDE_LEN_MIN=${3-9}  # Minimum peptide length (AA), "" or 0 disables the filter
+
+source "$SCRIPTS_DIR/ribokast.sh"
 
 # ==== INPUT FILE ====
 INPUT_FILE="$FILES_DIR/KmersFromContigsQuerySumPhaseSeqTranslatedPvalueRSState"
@@ -19,6 +22,7 @@ RS_P_PLUS_PEP_FA="$FILES_DIR/RS+P+_pep.fa"
 RS_P_MINUS_FA="$FILES_DIR/RS+P-.fa"
 RS_P_MINUS_PEP_FA="$FILES_DIR/RS+P-_pep.fa"
 FINAL_CONTIGS="$FILES_DIR/All_contig_of_peptides.fa"
+ORF_PROVENANCE="$FILES_DIR/ORFs_provenance.tsv"
 RS_MINUS="$FILES_DIR/RS-"
 RS_MINUS_FA="$FILES_DIR/RS.fa-"
 RS_MINUS_PEP_FA="$FILES_DIR/RS-_pep.fa"
@@ -47,12 +51,10 @@ awk 'NR > 1 {print ">"$1"\n"$2}' "$RS_MINUS" > "$RS_MINUS_FA"
 seqkit translate -F -f 1,2,3 "$RS_P_MINUS_FA" --line-width 7000 > "$RS_P_MINUS_PEP_FA"
 seqkit translate -F -f 1,2,3 "$RS_MINUS_FA" --line-width 7000 > "$RS_MINUS_PEP_FA"
 
-# ==== EXTRACT ORFs ====
-python3 "$SCRIPTS_DIR/getORF.py" "$RS_P_PLUS_PEP_FA" "$RS_P_PLUS_FA" "$FILES_DIR/contigsOfPeptides_RS+P+" all
-python3 "$SCRIPTS_DIR/getORF.py" "$RS_P_MINUS_PEP_FA" "$RS_P_MINUS_FA" "$FILES_DIR/contigsOfPeptides_RS+P-" all
-python3 "$SCRIPTS_DIR/getORF.py" "$RS_MINUS_PEP_FA" "$RS_MINUS_FA" "$FILES_DIR/contigsOfPeptides_RS-" all
-
-cat "$FILES_DIR/contigsOfPeptides_RS+P+" "$FILES_DIR/contigsOfPeptides_RS+P-" > "$FILES_DIR/all_contigsOfpeptides_RS+"
+# ==== EXTRACT ORFs (peptide length filter applied here) ====
+ribokast orf extract "$RS_P_PLUS_PEP_FA" "$RS_P_PLUS_FA" "$FILES_DIR/contigsOfPeptides_RS+P+" all "$PEPTIDE_LEN_MIN"
+ribokast orf extract "$RS_P_MINUS_PEP_FA" "$RS_P_MINUS_FA" "$FILES_DIR/contigsOfPeptides_RS+P-" all "$PEPTIDE_LEN_MIN"
+ribokast orf extract "$RS_MINUS_PEP_FA" "$RS_MINUS_FA" "$FILES_DIR/contigsOfPeptides_RS-" all "$PEPTIDE_LEN_MIN"
 
 # ==== TREAT RS- ====
 awk '
@@ -80,12 +82,14 @@ NR > FNR {
 }
 ' "$RS_MINUS_FA" "$FILES_DIR/contigsOfPeptides_RS-" > "$RS_MINUS_TABLE"
 
-# ==== FILTER CONTIGS BASED ON LENGTH ====
-awk 'NR > 1 && length($2) >= 9 {print ">"$2"\n"$4}' "$FILES_DIR/contigsOfPeptides_RS+P+" > "$FILES_DIR/contigsOfpeptides_RS+P+.fa"
-awk 'NR > 1 && length($2) >= 9 {print ">"$2"\n"$4}' "$FILES_DIR/contigsOfPeptides_RS+P-" > "$FILES_DIR/contigsOfpeptides_RS+P-.fa"
-awk 'NR > 1 && length($2) >= 9 {print ">"$2"\n"$3}' "$RS_MINUS_TABLE" > "$FILES_DIR/contigsOfpeptides_RS-.fa"
+# ==== RS- PEPTIDE FASTA ====
+awk 'NR > 1 {print ">"$2"\n"$3}' "$RS_MINUS_TABLE" > "$FILES_DIR/contigsOfpeptides_RS-.fa"
 
-# ==== MERGE RS+P+ AND RS+P- CONTIG FILES INTO ONE ====
-cat "$FILES_DIR/contigsOfpeptides_RS+P+.fa" "$FILES_DIR/contigsOfpeptides_RS+P-.fa" > "$FINAL_CONTIGS"
+# ==== COLLAPSE RS+P+ AND RS+P- ORFs INTO UNIQUE QUERY SEQUENCES ====
+# One FASTA record per distinct ORF nucleotide sequence (>ORF_<n>), with the
+# peptide/contig occurrences kept in $ORF_PROVENANCE for the final merge.
+ribokast orf collapse "$FINAL_CONTIGS" "$ORF_PROVENANCE" \
+    "$FILES_DIR/contigsOfPeptides_RS+P+" \
+    "$FILES_DIR/contigsOfPeptides_RS+P-"
 
 echo "Pipeline completed. Final file: $FINAL_CONTIGS"
@@ -23,13 +23,15 @@ $BASE_DIR/run_RiboKast.sh -contig "$INDEX_DIR" "$SCRIPTS_DIR" "$CONTIGS_DIR" "$S
 
 # ---- 1) Intermediates from run_RiboKast.sh (remove in BOTH contigs + orfpred dirs)
 for d in "$CONTIGS_DIR" "$ORFPRED_DIR"; do
+  for ext in "" ".gz" ".zst"; do
+    rm -f "$d/out$ext" "$d/RS+$ext" "$d/kmersFromContigs.fa$ext" "$d/KmersFromContigsQuery$ext"
+    rm -f "$d/kmersFromContigs.screen.fa$ext" "$d/KmersFromContigsQuery.screen$ext" "$d/KmersFromContigsQuerySum.screen$ext"
+  done
   rm -f \
-    "$d/out" \
-    "$d/RS+" \
     "$d/RS-" \
-    "$d/kmersFromContigs.fa" \
-    "$d/KmersFromContigsQuery" \
+    "$d/RS+.ambiguous.fa" \
     "$d/KmersFromContigsQuerySumPhase" \
     "$d/KmersFromContigsQuerySumPhaseSeq" \
     "$d/KmersFromContigsQuerySumPhaseSeqTranslatedPvalue" \
     "$d/KmersFromContigsQuerySumPhaseSeqTranslated"
+done
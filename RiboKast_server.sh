@@ -0,0 +1,31 @@
+#!/bin/bash
+#SBATCH --job-name="RiboKast_server"
+#SBATCH --partition=ssfa -t 100:00:00 --mem 64G
+#SBATCH --cpus-per-task=6
+
+# ==== ACTIVATE CONDA ENVIRONMENT ====
+source /home/safa.maddouri/miniconda3/bin/activate ribokast
+
+# ==== LOAD CONFIG ====
+SUBMIT_DIR="${SLURM_SUBMIT_DIR:-$PWD}"
+CONFIG_SH="${SUBMIT_DIR}/config.sh"
+source "$CONFIG_SH"
+source "$SCRIPTS_DIR/ribokast.sh"
+
+# ==== START SERVICE ====
+# Submit batches with:
+#   curl --data-binary @contigs.fa http://$SERVER_HOST:$SERVER_PORT/score
+ribokast serve \
+    --backend kamrat \
+    --index "$INDEX_DIR" \
+    --sif "$SIF_FILE" \
+    --kmer-len "$KMER_LEN" \
+    --phase-shift "$PHASE_SHIFT" \
+    --peptide-len-min "${PEPTIDE_LEN_MIN:-0}" \
+    --toquery "${KAMRAT_TOQUERY:-mean}" \
+    --counts "${KAMRAT_COUNTS:-float}" \
+    --host "$SERVER_HOST" \
+    --port "$SERVER_PORT" \
+    --workers "$SERVER_WORKERS" \
+    --queue-size "$SERVER_QUEUE_SIZE" \
+    --max-body-mb "${SERVER_MAX_BODY_MB:-64}"
@@ -2,7 +2,7 @@
 
 # ==== CHECK USAGE ====
 if [ "$#" -lt 3 ]; then
-    echo "Usage: $0 <FILES_DIR> <SCRIPTS_DIR> <INPUT_FILE>"
+    echo "Usage: $0 <FILES_DIR> <SCRIPTS_DIR> <INPUT_FILE> [<PEPTIDE_LEN_MIN>]"
     exit 1
 fi
 
@@ -10,6 +10,9 @@ fi
 FILES_DIR=$1  # Main directory path
 SCRIPTS_DIR=$2  # Scripts directory
 INPUT_FILE=$3  # Input file
+PEPTIDE_LEN_MIN=${4-9}  # Minimum peptide length (AA), "" or 0 disables the filter
+
+source "$SCRIPTS_DIR/ribokast.sh"
 
 # Output files (inside FILES_DIR)
 RS_P_PLUS_FA="$FILES_DIR/RS+P+.fa"
@@ -17,6 +20,12 @@ RS_P_PLUS_PEP_FA="$FILES_DIR/RS+P+_pep.fa"
 RS_P_MINUS_FA="$FILES_DIR/RS+P-.fa"
 RS_P_MINUS_PEP_FA="$FILES_DIR/RS+P-_pep.fa"
 FINAL_CONTIGS="$FILES_DIR/All_contig_of_peptides.fa"
+ORF_PROVENANCE="$FILES_DIR/ORFs_provenance.tsv"
+
+# ==== INITIALIZE OUTPUT FILES ====
+: > "$RS_P_PLUS_FA"
+: > "$RS_P_PLUS_PEP_FA"
+: > "$RS_P_MINUS_FA"
 
 # ==== GENERATE FASTA FILES USING AWK ====
 awk -v rs_p_plus_fa="$RS_P_PLUS_FA" -v rs_p_plus_pep_fa="$RS_P_PLUS_PEP_FA" -v rs_p_minus_fa="$RS_P_MINUS_FA" '{
@@ -34,15 +43,15 @@ awk -v rs_p_plus_fa="$RS_P_PLUS_FA" -v rs_p_plus_pep_fa="$RS_P_PLUS_PEP_FA" -v r
 # ==== TRANSLATE RS+P- DNA SEQUENCES TO PROTEIN ====
 seqkit translate -F -f 1,2,3 "$RS_P_MINUS_FA" --line-width 7000 > "$RS_P_MINUS_PEP_FA"
 
-# ==== EXTRACT ORFs ====
-python3 "$SCRIPTS_DIR/getORF.py" "$RS_P_PLUS_PEP_FA" "$RS_P_PLUS_FA" "$FILES_DIR/contigsOfPeptides_RS+P+" before_stop
-python3 "$SCRIPTS_DIR/getORF.py" "$RS_P_MINUS_PEP_FA" "$RS_P_MINUS_FA" "$FILES_DIR/contigsOfPeptides_RS+P-" all
-
-# ==== FILTER CONTIGS BASED ON LENGTH ====
-awk 'NR > 1 && length($2) >= 9 {print ">"$2"\n"$4}' "$FILES_DIR/contigsOfPeptides_RS+P+" > "$FILES_DIR/contigsOfpeptides_RS+P+.fa"
-awk 'NR > 1 && length($2) >= 9 {print ">"$2"\n"$4}' "$FILES_DIR/contigsOfPeptides_RS+P-" > "$FILES_DIR/contigsOfpeptides_RS+P-.fa"
+# ==== EXTRACT ORFs (peptide length filter applied here) ====
+ribokast orf extract "$RS_P_PLUS_PEP_FA" "$RS_P_PLUS_FA" "$FILES_DIR/contigsOfPeptides_RS+P+" before_stop "$PEPTIDE_LEN_MIN"
+ribokast orf extract "$RS_P_MINUS_PEP_FA" "$RS_P_MINUS_FA" "$FILES_DIR/contigsOfPeptides_RS+P-" all "$PEPTIDE_LEN_MIN"
 
-# ==== MERGE RS+P+ AND RS+P- CONTIG FILES INTO ONE ====
-cat "$FILES_DIR/contigsOfpeptides_RS+P+.fa" "$FILES_DIR/contigsOfpeptides_RS+P-.fa" > "$FINAL_CONTIGS"
+# ==== COLLAPSE RS+P+ AND RS+P- ORFs INTO UNIQUE QUERY SEQUENCES ====
+# One FASTA record per distinct ORF nucleotide sequence (>ORF_<n>), with the
+# peptide/contig occurrences kept in $ORF_PROVENANCE for the final merge.
+ribokast orf collapse "$FINAL_CONTIGS" "$ORF_PROVENANCE" \
+    "$FILES_DIR/contigsOfPeptides_RS+P+" \
+    "$FILES_DIR/contigsOfPeptides_RS+P-"
 
 echo "Pipeline completed. Final file: $FINAL_CONTIGS"
@@ -0,0 +1,9 @@
+#!/bin/bash
+# `ribokast` command for the shell drivers (source this file).
+#
+# Runs the ribokast/ package that sits next to SCRIPTS_DIR, so the drivers
+# work with or without `pip install -e .`.
+
+ribokast() {
+    PYTHONPATH="$(cd "$SCRIPTS_DIR/.." && pwd)${PYTHONPATH:+:$PYTHONPATH}" python3 -m ribokast "$@"
+}
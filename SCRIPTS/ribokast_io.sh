@@ -0,0 +1,51 @@
+#!/bin/bash
+# Shared I/O helpers for the RiboKast shell drivers (source this file).
+#
+# Files ending in .gz / .zst are (de)compressed on the fly, everything else is
+# plain text. Settings (see config.sh):
+#   COMPRESS_INTERMEDIATES  "", "gz" or "zst"
+#   COMPRESS_THREADS        compression threads (0 = all cores)
+
+COMPRESS_INTERMEDIATES="${COMPRESS_INTERMEDIATES:-}"
+COMPRESS_THREADS="${COMPRESS_THREADS:-0}"
+export COMPRESS_INTERMEDIATES COMPRESS_THREADS
+
+if [[ -n "$COMPRESS_INTERMEDIATES" && "$COMPRESS_INTERMEDIATES" != "gz" && "$COMPRESS_INTERMEDIATES" != "zst" ]]; then
+    echo "ERROR: COMPRESS_INTERMEDIATES must be empty, 'gz' or 'zst' (got: $COMPRESS_INTERMEDIATES)" >&2
+    exit 1
+fi
+
+# Suffix to append to intermediate file names ("" when compression is off)
+rk_ext() {
+    if [[ -n "$COMPRESS_INTERMEDIATES" ]]; then
+        echo ".$COMPRESS_INTERMEDIATES"
+    fi
+}
+
+rk_is_compressed() {
+    [[ "$1" == *.gz || "$1" == *.zst ]]
+}
+
+# rk_cat FILE : print FILE decompressed to stdout
+rk_cat() {
+    case "$1" in
+        *.zst) zstd -q -dc "$1" ;;
+        *.gz)
+            if command -v pigz > /dev/null; then pigz -dc "$1"; else gzip -dc "$1"; fi ;;
+        *) cat "$1" ;;
+    esac
+}
+
+# rk_write FILE : write stdin to FILE, compressed according to its extension
+rk_write() {
+    case "$1" in
+        *.zst) zstd -q -f -T"$COMPRESS_THREADS" -o "$1" ;;
+        *.gz)
+            if command -v pigz > /dev/null; then
+                if [[ "$COMPRESS_THREADS" -gt 0 ]]; then pigz -c -p "$COMPRESS_THREADS" > "$1"; else pigz -c > "$1"; fi
+            else
+                gzip -c > "$1"
+            fi ;;
+        *) cat > "$1" ;;
+    esac
+}
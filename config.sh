@@ -22,10 +22,53 @@ KAMRAT_WITHABSENT="1"     # 1 or 0
 PHASE_SHIFT="0"
 
 # ==== PEPTIDE LENGTH FILTER (optional) ====
-# If set, remove rows where peptide length is <= this value.
-# Leave empty ("") to disable the filter.
+# If set, `ribokast orf extract` drops peptides shorter than this value (AA) before the
+# ORF-level KaMRaT query. Leave empty ("") to disable the filter.
 PEPTIDE_LEN_MIN="9"
 
+# ==== COMPRESSED INTERMEDIATES (optional) ====
+# "" = plain text, "gz" (pigz/gzip) or "zst" (zstd). Applies to out, out_id,
+# RS+, kmersFromContigs.fa, KmersFromContigsQuery and KmersFromContigsQuerySum.
+# COMPRESS_THREADS: compression threads (0 = all cores).
+export COMPRESS_INTERMEDIATES=""
+export COMPRESS_THREADS="6"
+
+# ==== BINOMIAL TEST RANKING ====
+# Memory budget (MB) for sorting rows by p-value; larger tables are sorted in
+# runs spilled to the results directory and merged.
+export BINOM_MEMORY_MB="512"
+
+# ==== CHUNKED PIPELINE (optional) ====
+# If set, RS+ contigs are processed in chunks of this many contigs: the KaMRaT
+# query of one chunk overlaps with sum/phase/translate/test of earlier chunks.
+# PIPELINE_JOBS bounds the chunks processed concurrently. Leave empty to disable.
+export PIPELINE_CHUNK_SIZE=""
+export PIPELINE_JOBS="4"
+
+# ==== PHASE SCREENING (optional) ====
+# If set, the per-contig k-mer query first covers only every SCREEN_STRIDE-th
+# triplet of k-mers; contigs whose RS+P+ / RS+P- call is already clear at
+# SCREEN_CONFIDENCE (and with at least SCREEN_MIN_VOTES sampled votes) skip the
+# full-resolution query. screen_report.tsv gives the k-mer reduction and, with
+# SCREEN_REFERENCE set to the results directory of a full-mode run on the same
+# input (e.g. its RESULTS_CONTIGS), the agreement with the RSState table of the
+# same name found there. Leave SCREEN_STRIDE empty to query every k-mer.
+# Contigs called early keep the P1/P2/P3 and p_value of the sampled triplets,
+# which are not comparable with full-resolution ones: the Pvalue / RSState
+# tables get two extra columns before RSState, screened (yes / no) and
+# screen_stride (SCREEN_STRIDE for screened rows, 1 otherwise).
+export SCREEN_STRIDE=""
+export SCREEN_CONFIDENCE="0.999"
+export SCREEN_MIN_VOTES="10"
+export SCREEN_REFERENCE=""
+
+# ==== SERVICE MODE (RiboKast_server.sh) ====
+SERVER_HOST="127.0.0.1"
+SERVER_PORT="8765"
+SERVER_WORKERS="2"        # batches scored concurrently
+SERVER_QUEUE_SIZE="8"     # batches allowed to wait; further requests get HTTP 503
+SERVER_MAX_BODY_MB="64"   # larger request bodies get HTTP 413 without being read
+
 # ==== DIRECTORIES ==== DERIVED DIRECTORIES === (no need to change)
 
 CONTIGS_DIR="$OUT_DIR/RESULTS_CONTIGS"
@@ -38,7 +81,8 @@ OUTPUT_FILE="$ORFPRED_DIR/allORFsAnnotated.tsv"
 
 # ==== MERGE INPUTS ====
 RSPLUS_KMERS="$ORFPRED_DIR/KmersFromContigsQuerySumPhaseSeqPvalueRSState"
-RSPLUS_CONTIGS="$CONTIGS_DIR/all_contigsOfpeptides_RS+"
+ORF_PROVENANCE="$CONTIGS_DIR/ORFs_provenance.tsv"   # ORF_id -> peptide/contig occurrences
+RSPLUS_CONTIGS="$ORF_PROVENANCE"
 RSMINUS_pep_CONTIGS="$CONTIGS_DIR/contigsOfPeptides_RS-"
 RSMINUS_CONTIGS="$CONTIGS_DIR/RS-.tsv"
 MERGE_OUTPUT_NO_ANNOT="$ORFPRED_DIR/ORFs_RSState.tsv"
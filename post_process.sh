@@ -13,6 +13,8 @@ source /home/safa.maddouri/miniconda3/bin/activate ribokast
 SUBMIT_DIR="${SLURM_SUBMIT_DIR:-$PWD}"
 CONFIG_SH="${SUBMIT_DIR}/config.sh"
 source "$CONFIG_SH"
+source "$SCRIPTS_DIR/ribokast_io.sh"
+source "$SCRIPTS_DIR/ribokast.sh"
 
 RESULTS_DIR="$CONTIGS_DIR"
 PLOTS_DIR="$RESULTS_DIR/plots"
@@ -20,7 +22,7 @@ mkdir -p "$PLOTS_DIR"
 
 # ---- Inputs ----
 INPUT_RSSTATE="$RESULTS_DIR/KmersFromContigsQuerySumPhaseSeqTranslatedPvalueRSState"
-IN_TSV="$RESULTS_DIR/KmersFromContigsQuerySum"
+IN_TSV="$RESULTS_DIR/KmersFromContigsQuerySum$(rk_ext)"
 
 # ---- Output FASTA we will generate here ----
 FASTA_RS="$RESULTS_DIR/RS+P+.fa"
@@ -76,24 +78,17 @@ trap cleanup EXIT
 grep '^>' "$FASTA_RS" | sed 's/^>//' | cut -d' ' -f1 > "$IDS_FILE"
 [[ -s "$IDS_FILE" ]] || { echo "[ERROR] No IDs extracted from FASTA headers in: $FASTA_RS" >&2; exit 1; }
 
-# 2) Filter while ALWAYS keeping the header from input
-awk '
-NR==FNR { keep[$1]=1; next }
-FNR==1  { print $0; next }
-{
-  base=$1
-  sub(/_kmer_[0-9]+$/, "", base)
-  if (keep[base]) print $0
-}
-' "$IDS_FILE" "$IN_TSV" > "$FILTERED_TSV"
+# 2) Header + rows of the selected contigs, read through the per-contig
+#    offset index written with the sum table ($IN_TSV.idx, built here once if missing)
+ribokast kmers select "$IN_TSV" "$IDS_FILE" "$FILTERED_TSV"
 
 echo "[INFO] Using filtered temporary file: $FILTERED_TSV"
 echo "[INFO] Header:"
 head -n 1 "$FILTERED_TSV"
 
 # 3) Plots on filtered file
-python3 "$SCRIPTS_DIR/plotdist.py" "$FILTERED_TSV" "$PLOTS_DIR"
-python3 "$SCRIPTS_DIR/plot_dis_phase_histogrames.py" "$FILTERED_TSV" "$PLOTS_DIR"
+ribokast plot dist "$FILTERED_TSV" "$PLOTS_DIR"
+ribokast plot hist "$FILTERED_TSV" "$PLOTS_DIR"
 Rscript "$SCRIPTS_DIR/heatmaps.R" "$FILTERED_TSV" "$PLOTS_DIR"
 echo "[INFO] Done. Intermediate files cleaned."
 
@@ -0,0 +1,9 @@
+"""
+RiboKast: reference-free translation prediction from Ribo-seq k-mers.
+
+The pipeline steps are exposed as subcommands of the ``ribokast`` command
+(see ``ribokast --help``). Heavy libraries (pandas, scipy, matplotlib) are
+only imported by the subcommands that need them.
+"""
+
+__version__ = "0.1.0"
@@ -0,0 +1,43 @@
+import csv
+from .ribokast_io import open_text
+
+def add_state_column(header, rows, significance_threshold=0.05):
+    """Append the RSState column to tested rows (p_value column re-rendered as a float)."""
+    p_col = header.index('p_value')
+    stated = []
+    for row in rows:
+        p_value = float(row[p_col])
+        row[p_col] = repr(p_value)  # same float rendering as the previous pandas round-trip
+        stated.append(row + ['RS+P+' if p_value < significance_threshold else 'RS+P-'])
+    return header + ['RSState'], stated
+
+def rs_minus_row(header, tag, contig_id):
+    """Row of an RS- contig: sequence, id, NA values."""
+    return [tag, contig_id] + ['NA'] * (len(header) - 3) + ['RS-']
+
+# Step 1: Process the contig file and add RSState
+def process_contig_file(input_file, significance_threshold=0.05):
+    with open_text(input_file) as fh:
+        reader = csv.reader(fh, delimiter='\t', quoting=csv.QUOTE_NONE)
+        header = next(reader)
+        return add_state_column(header, list(reader), significance_threshold)
+
+# Step 2: Process the second file and append it to the contig output
+def process_and_merge_files(contig_table, second_file, output_file):
+    header, rows = contig_table
+    with open_text(second_file) as fh:
+        for row in csv.DictReader(fh, delimiter='\t', quoting=csv.QUOTE_NONE):
+            # RS- contigs: sequence and id, NA for every value column
+            rows.append(rs_minus_row(header, row['tag'], row['ID']))
+    with open_text(output_file, 'w') as fh:
+        fh.write('\t'.join(header) + '\n')
+        for row in rows:
+            fh.write('\t'.join(row) + '\n')
+    print(f"File saved successfully as {output_file}")
+
+def add_rs_state(contig_file, second_file, output_file):
+    # Step 1: Process the contig file
+    contig_table = process_contig_file(contig_file)
+
+    # Step 2: Process the second file and merge with the contig data
+    process_and_merge_files(contig_table, second_file, output_file)
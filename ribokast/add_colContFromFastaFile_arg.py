@@ -0,0 +1,20 @@
+from .fasta import read_fasta
+from .ribokast_io import open_text
+
+
+def add_contig_column(fasta_file, table_file, output_file):
+    """Prepend the contig sequence (looked up by the first column id) to each table row."""
+    # Read the FASTA file and store the contig ID <-> contig mappings
+    fasta_contig_mapping = read_fasta(fasta_file)
+
+    # Add the contig column to the table file
+    with open_text(table_file, "r") as table, open_text(output_file, "w") as output:
+        header = table.readline().strip()
+        output.write("contig\t" + header + "\n")  # Add a new column for the contig identifiers
+        for line in table:
+            contig_id = line.split()[0]  # Extract the contig ID from the table file
+
+            print(contig_id)
+            if contig_id in fasta_contig_mapping:  # Check if the contig ID exists in the FASTA file
+                corresponding_contig = fasta_contig_mapping[contig_id]
+                output.write(corresponding_contig + "\t" + line)  # Add the corresponding contig ID as the first column
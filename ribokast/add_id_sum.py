@@ -0,0 +1,33 @@
+from .fasta import read_fasta_ids
+from .ribokast_io import open_text
+from .sum_index import SumIndexBuilder
+
+def process_line(line, ids):
+    fields = line.strip().split("\t")
+    sum_value = sum(float(field) for field in fields[1:])
+    return f"{ids.pop(0)}\t{line.strip()}\t{sum_value}"
+
+def add_id_sum(fasta_file, table_file, output_file, index=True):
+    """
+    Prefix each k-mer query row with its FASTA id and append the row sum.
+    With index, also write the per-contig offset index (<output_file>.idx)
+    when the rows of each contig are contiguous.
+    """
+    # Read IDs from the FASTA file
+    fasta_ids = read_fasta_ids(fasta_file)
+    builder = SumIndexBuilder() if index else None
+
+    # Read the table and write it back with IDs and sum, one line at a time
+    with open_text(table_file, 'r') as table, open_text(output_file, 'w') as output:
+        header = "id\t{}\tsum\n".format(table.readline().strip())
+        output.write(header)
+        if builder:
+            builder.add_header(header)
+        for line, fasta_id in zip(table, fasta_ids):
+            row = process_line(line, [fasta_id]) + '\n'
+            output.write(row)
+            if builder:
+                builder.add(row)
+
+    if builder:
+        builder.write(output_file)
@@ -0,0 +1,24 @@
+import sys
+from .fasta import read_fasta_ids
+from .ribokast_io import open_text
+
+
+def add_ids(fasta_file, data_file, output_file):
+    """Insert the FASTA record ids as the first column ('ID') of a KaMRaT query table."""
+    # Extract IDs from the FASTA file
+    ids = read_fasta_ids(fasta_file)
+
+    with open_text(data_file, 'r') as data:
+        header = data.readline().rstrip("\n")
+        rows = [line.rstrip("\n") for line in data if line.strip()]
+
+    # Ensure the number of IDs matches the number of rows in the data
+    if len(ids) != len(rows):
+        print("Error: The number of IDs does not match the number of rows in the data file.")
+        sys.exit(1)
+
+    # Insert the IDs as the first column
+    with open_text(output_file, 'w') as out:
+        out.write(f"ID\t{header}\n")
+        for contig_id, row in zip(ids, rows):
+            out.write(f"{contig_id}\t{row}\n")
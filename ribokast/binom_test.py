@@ -0,0 +1,140 @@
+import heapq
+import os
+import sys
+import tempfile
+from .ribokast_io import open_text
+
+def read_table(file_path):
+    with open_text(file_path, 'r') as file:
+        lines = file.readlines()
+    table = [line.rstrip("\n").split('\t') for line in lines]
+    return table
+
+def major_pvalue(k, n):
+    """Binomial p-value (4 decimals) of k major-phase triplets out of n, H0 p=1/3."""
+    # Avoid division by zero if a row has 0 total counts
+    if n == 0:
+        return "1.0000"
+
+    from scipy.stats import binomtest
+
+    p_value = binomtest(k=k, n=n, p=1/3).pvalue
+    return f"{p_value:.4f}"
+
+def phase_pvalue(row):
+    """Binomial p-value (4 decimals) of the major phase among P1/P2/P3 (columns 3-5)."""
+    phases = [int(row[i]) for i in range(2, 5)]
+    return major_pvalue(max(phases), sum(phases))
+
+def determine_major_phase(table, significance_threshold=0.05):
+    new_table = [table[0] + ["p_value"]]  # header + p_value column
+
+    for row in table[1:]:
+        row.append(phase_pvalue(row))
+        new_table.append(row)
+
+    headers = new_table[0]
+    data = new_table[1:]
+    data_sorted = sorted(data, key=lambda x: float(x[-1]))  # sort by p_value
+    return [headers] + data_sorted
+
+# ----------------------------
+# Streaming ranking
+# ----------------------------
+# Rows are keyed on (numeric p-value, input position), which gives the same
+# stable order as determine_major_phase without holding the table in memory.
+# At most MAX_MERGE_RUNS runs are open at once: above that, groups of runs are
+# first merged into longer runs.
+
+MAX_MERGE_RUNS = 64
+
+def _write_run(rows, tmp_dir):
+    rows.sort(key=lambda x: (float(x[2][-1]), x[1]))
+    fd, path = tempfile.mkstemp(prefix="binom_run_", dir=tmp_dir)
+    with os.fdopen(fd, 'w') as run:
+        for _, index, row in rows:
+            run.write(f"{index}\t" + '\t'.join(row) + "\n")
+    return path
+
+def _read_run(path):
+    with open(path, 'r') as run:
+        for line in run:
+            index, rest = line.rstrip("\n").split('\t', 1)
+            row = rest.split('\t')
+            yield (float(row[-1]), int(index), row)
+
+def _merge_runs(paths, tmp_dir):
+    fd, path = tempfile.mkstemp(prefix="binom_run_", dir=tmp_dir)
+    with os.fdopen(fd, 'w') as run:
+        for _, index, row in heapq.merge(*[_read_run(p) for p in paths]):
+            run.write(f"{index}\t" + '\t'.join(row) + "\n")
+    return path
+
+def iter_ranked(lines, memory_mb=512, tmp_dir=None):
+    """
+    Yield data rows (p_value appended) sorted by p-value, spilling sorted runs
+    of about memory_mb to tmp_dir and k-way merging them.
+    """
+    if memory_mb <= 0:
+        raise ValueError(f"memory budget must be positive (got {memory_mb} MB)")
+    budget = memory_mb * 1024 * 1024
+    rows, size, runs = [], 0, []
+    try:
+        for index, line in enumerate(lines):
+            row = line.rstrip("\n").split('\t')
+            row.append(phase_pvalue(row))
+            rows.append((None, index, row))
+            size += 2 * len(line) + 200  # rough in-memory footprint of the row
+            if size >= budget:
+                runs.append(_write_run(rows, tmp_dir))
+                rows, size = [], 0
+
+        if not runs:
+            rows.sort(key=lambda x: (float(x[2][-1]), x[1]))
+            for _, _, row in rows:
+                yield row
+            return
+
+        if rows:
+            runs.append(_write_run(rows, tmp_dir))
+            rows = []
+        while len(runs) > MAX_MERGE_RUNS:
+            group = runs[:MAX_MERGE_RUNS]
+            runs = runs[MAX_MERGE_RUNS:] + [_merge_runs(group, tmp_dir)]
+            for path in group:
+                os.remove(path)
+        for _, _, row in heapq.merge(*[_read_run(path) for path in runs]):
+            yield row
+    finally:
+        for path in runs:
+            os.remove(path)
+
+def iter_top_k(lines, k):
+    """Yield the k rows with the smallest p-values (ties: input order), sorted."""
+    if k < 1:
+        raise ValueError(f"top-k must be at least 1 (got {k})")
+    heap = []  # max-heap on (p_value, index) through negated keys
+    for index, line in enumerate(lines):
+        row = line.rstrip("\n").split('\t')
+        row.append(phase_pvalue(row))
+        item = (-float(row[-1]), -index, row)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    for _, _, row in sorted(heap, key=lambda x: (-x[0], -x[1])):
+        yield row
+
+def binom(file_path, memory_mb=512, tmp_dir=None, top_k=None, out=None):
+    """Write the table with a p_value column, rows ranked by p-value, to out (default: stdout)."""
+    out = out or sys.stdout
+    with open_text(file_path, 'r') as table:
+        header = table.readline().rstrip("\n").split('\t')
+        if top_k is not None:
+            ranked = iter_top_k(table, top_k)
+        else:
+            ranked = iter_ranked(table, memory_mb, tmp_dir)
+
+        out.write('\t'.join(header + ["p_value"]) + "\n")
+        for row in ranked:
+            out.write('\t'.join(row) + "\n")
@@ -0,0 +1,410 @@
+"""
+`ribokast` command line.
+
+Each subcommand imports its step module only when it runs, and the step
+modules import pandas / scipy / matplotlib inside the functions that need
+them, so stdlib-only steps (kmers, orf, merge plain, phase addseq/rsstate)
+start without loading them.
+
+    ribokast kmers  addid | generate | sum | index | select
+    ribokast phase  count | addseq | rsstate | screen | screen-merge | screen-mark | screen-report
+    ribokast binom
+    ribokast orf    extract | collapse
+    ribokast merge  plain | annotated
+    ribokast plot   phase | hist | dist
+    ribokast serve
+    ribokast startup
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from . import __version__
+
+HEAVY_MODULES = ["numpy", "pandas", "scipy", "matplotlib"]
+
+# subcommand -> (module it imports, heavy libraries it imports lazily when it runs)
+SUBCOMMAND_MODULES = {
+    "kmers addid": ("addid", []),
+    "kmers generate": ("generate_kmers_fromFasta", []),
+    "kmers sum": ("add_id_sum", []),
+    "kmers index": ("sum_index", []),
+    "kmers select": ("sum_index", []),
+    "phase count": ("phaseCount", ["pandas"]),
+    "phase addseq": ("add_colContFromFastaFile_arg", []),
+    "phase rsstate": ("addRSState", []),
+    "phase screen": ("screen", ["scipy.stats"]),
+    "phase screen-merge": ("screen", []),
+    "phase screen-mark": ("screen", []),
+    "phase screen-report": ("screen", []),
+    "binom": ("binom_test", ["scipy.stats"]),
+    "orf extract": ("getORF", []),
+    "orf collapse": ("getORF", []),
+    "merge plain": ("merge_no_ann", []),
+    "merge annotated": ("merge_f", ["pandas"]),
+    "plot phase": ("plotPhase", ["pandas", "matplotlib.pyplot"]),
+    "plot hist": ("plot_dis_phase_histogrames", ["pandas", "matplotlib.pyplot"]),
+    "plot dist": ("plotdist", ["pandas", "matplotlib.pyplot"]),
+    "serve": ("ribokast_server", ["pandas"]),
+}
+
+
+# ----------------------------
+# Handlers
+# ----------------------------
+
+def _kmers_addid(args):
+    from .addid import add_ids
+    add_ids(args.fasta, args.table, args.output)
+
+
+def _kmers_generate(args):
+    from .generate_kmers_fromFasta import generate_kmers_from_fasta
+    generate_kmers_from_fasta(args.fasta, args.output, args.k, args.stride)
+
+
+def _kmers_sum(args):
+    from .add_id_sum import add_id_sum
+    add_id_sum(args.fasta, args.table, args.output, not args.no_index)
+
+
+def _kmers_index(args):
+    from .sum_index import build_index, merge_chunk_indexes
+    if args.chunks:
+        merge_chunk_indexes(args.table, args.chunks)
+    else:
+        build_index(args.table)
+
+
+def _kmers_select(args):
+    from .sum_index import select_contigs
+    select_contigs(args.table, args.ids, args.output)
+
+
+def _phase_count(args):
+    from .phaseCount import phase_count
+    phase_count(args.input, args.output, args.shift)
+
+
+def _phase_addseq(args):
+    from .add_colContFromFastaFile_arg import add_contig_column
+    add_contig_column(args.fasta, args.table, args.output)
+
+
+def _phase_rsstate(args):
+    from .addRSState import add_rs_state
+    add_rs_state(args.pvalue_table, args.rsminus, args.output)
+
+
+def _phase_screen(args):
+    from .screen import screen
+    screen(args.sum_table, args.fasta, args.calls, args.ambiguous, args.k, args.stride,
+           args.confidence, args.min_votes)
+
+
+def _phase_screen_merge(args):
+    from .screen import merge_sums
+    merge_sums(args.screen_sum, args.calls, args.output, args.full_sum)
+
+
+def _phase_screen_mark(args):
+    from .screen import mark_screened
+    mark_screened(args.pvalue_table, args.calls, args.output, args.stride)
+
+
+def _phase_screen_report(args):
+    from .screen import screen_report
+    screen_report(args.calls, args.screened, args.reference)
+
+
+def _binom(args):
+    from .binom_test import binom
+    binom(args.table, args.memory_mb, args.tmp_dir, args.top_k)
+
+
+def _orf_extract(args):
+    from .getORF import extract_orfs
+    extract_orfs(args.translation, args.contigs, args.output, args.mode, args.min_peptide_len)
+
+
+def _orf_collapse(args):
+    from .getORF import collapse
+    collapse(args.query_fasta, args.provenance, args.tables)
+
+
+def _merge_plain(args):
+    from .merge_no_ann import merge_no_annotation
+    merge_no_annotation(args.rsplus, args.provenance, args.rsminus, args.output)
+
+
+def _merge_annotated(args):
+    from .merge_f import merge_annotated
+    merge_annotated(args.fich1, args.contigs, args.annotation, args.rsminus, args.output)
+
+
+def _plot_phase(args):
+    from .plotPhase import plot_phase
+    plot_phase(args.input, args.output_dir)
+
+
+def _plot_hist(args):
+    from .plot_dis_phase_histogrames import plot_phase_histograms
+    plot_phase_histograms(args.input, args.output_dir)
+
+
+def _plot_dist(args):
+    from .plotdist import plot_distribution
+    plot_distribution(args.input, args.output_dir)
+
+
+def _serve(args):
+    from .ribokast_server import main as serve_main
+    serve_main(args.server_args)
+
+
+# ----------------------------
+# Startup measurement
+# ----------------------------
+
+_PROBE = """
+import importlib, json, sys, time
+module, lazy = sys.argv[1], [m for m in sys.argv[2].split(",") if m]
+t0 = time.perf_counter()
+importlib.import_module("ribokast.cli")
+t1 = time.perf_counter()
+importlib.import_module("ribokast." + module)
+t2 = time.perf_counter()
+missing = []
+for name in lazy:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        missing.append(name)
+t3 = time.perf_counter()
+heavy = [m for m in sys.argv[3:] if m in sys.modules]
+print(json.dumps({"cli_ms": (t1 - t0) * 1000, "module_ms": (t2 - t1) * 1000,
+                  "lazy_ms": (t3 - t2) * 1000, "heavy": heavy, "missing": missing}))
+"""
+
+
+def _probe(module, lazy, repeat):
+    env = dict(os.environ)
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = package_root + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", _PROBE, module, ",".join(lazy)] + HEAVY_MODULES,
+                             env=env, check=True, capture_output=True, text=True).stdout
+        result = json.loads(out)
+        result["total_ms"] = (time.perf_counter() - start) * 1000
+        runs.append(result)
+    # Best of N: the least noisy estimate of the fixed cost
+    return min(runs, key=lambda r: r["total_ms"])
+
+
+def _startup(args):
+    """
+    Time a fresh interpreter importing each subcommand's module and the heavy
+    libraries it loads once it runs (everything except the work itself).
+    """
+    print("subcommand\tprocess_ms\tcli_ms\tmodule_ms\tlazy_ms\theavy_imports")
+    for name, (module, lazy) in SUBCOMMAND_MODULES.items():
+        if args.subcommands and name.split()[0] not in args.subcommands and name not in args.subcommands:
+            continue
+        r = _probe(module, lazy, args.repeat)
+        heavy = ','.join(r['heavy']) or '-'
+        if r['missing']:
+            heavy += f" (not installed: {','.join(r['missing'])})"
+        print(f"{name}\t{r['total_ms']:.0f}\t{r['cli_ms']:.0f}\t{r['module_ms']:.0f}\t{r['lazy_ms']:.0f}\t{heavy}")
+
+
+# ----------------------------
+# Parser
+# ----------------------------
+
+def _optional_int(value):
+    """int argument where the drivers may pass an empty string for 'unset'."""
+    return int(value) if value else 0
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1 (got {value})")
+    return number
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ribokast", description="RiboKast pipeline steps.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    # ==== kmers ====
+    kmers = commands.add_parser("kmers", help="K-mer generation and KaMRaT query post-processing")
+    steps = kmers.add_subparsers(dest="step", metavar="STEP", required=True)
+
+    p = steps.add_parser("addid", help="Prepend the FASTA ids to a KaMRaT query table")
+    p.add_argument("fasta")
+    p.add_argument("table")
+    p.add_argument("output")
+    p.set_defaults(func=_kmers_addid)
+
+    p = steps.add_parser("generate", help="Write every k-mer of each contig as FASTA")
+    p.add_argument("fasta")
+    p.add_argument("output")
+    p.add_argument("k", type=int)
+    p.add_argument("--stride", type=_positive_int, default=1, help="Keep every STRIDE-th triplet of k-mers only (default: 1, all k-mers)")
+    p.set_defaults(func=_kmers_generate)
+
+    p = steps.add_parser("sum", help="Add k-mer ids and the per-k-mer count sum to a query table")
+    p.add_argument("fasta")
+    p.add_argument("table")
+    p.add_argument("output")
+    p.add_argument("--no-index", action="store_true", help="Do not write the per-contig offset index (<output>.idx)")
+    p.set_defaults(func=_kmers_sum)
+
+    p = steps.add_parser("index", help="Write the per-contig offset index (<table>.idx) of a sum table")
+    p.add_argument("table")
+    p.add_argument("--chunks", nargs="+", help="Indexed chunk tables TABLE was concatenated from (no rescan)")
+    p.set_defaults(func=_kmers_index)
+
+    p = steps.add_parser("select", help="Rows of the listed contigs of a sum table, read through its index")
+    p.add_argument("table")
+    p.add_argument("ids", help="Contig ids, one per line")
+    p.add_argument("output")
+    p.set_defaults(func=_kmers_select)
+
+    # ==== phase ====
+    phase = commands.add_parser("phase", help="Phase counting and RS state")
+    steps = phase.add_subparsers(dest="step", metavar="STEP", required=True)
+
+    p = steps.add_parser("count", help="Sum k-mer counts into P1/P2/P3 per contig")
+    p.add_argument("input")
+    p.add_argument("output")
+    p.add_argument("shift", nargs="?", default="0", choices=["0", "+1", "-1"])
+    p.set_defaults(func=_phase_count)
+
+    p = steps.add_parser("addseq", help="Add the contig sequence column from a FASTA file")
+    p.add_argument("fasta")
+    p.add_argument("table")
+    p.add_argument("output")
+    p.set_defaults(func=_phase_addseq)
+
+    p = steps.add_parser("rsstate", help="Add the RSState column (RS+P+, RS+P-, RS-)")
+    p.add_argument("pvalue_table")
+    p.add_argument("rsminus")
+    p.add_argument("output")
+    p.set_defaults(func=_phase_rsstate)
+
+    p = steps.add_parser("screen", help="Call RS+P+/RS+P- contigs from a strided (tier-1) k-mer query")
+    p.add_argument("sum_table", help="KmersFromContigsQuerySum of the strided k-mers")
+    p.add_argument("fasta", help="RS+ contigs")
+    p.add_argument("calls", help="Per-contig calls table to write")
+    p.add_argument("ambiguous", help="FASTA of the contigs left for the full query")
+    p.add_argument("k", type=int)
+    p.add_argument("--stride", type=_positive_int, required=True, help="Stride used by `kmers generate`")
+    p.add_argument("--confidence", type=float, default=0.999, help="Confidence of the early calls (default: 0.999)")
+    p.add_argument("--min-votes", type=int, default=10, help="Fewer sampled votes than this -> ambiguous (default: 10)")
+    p.set_defaults(func=_phase_screen)
+
+    p = steps.add_parser("screen-merge", help="Combine tier-1 and tier-2 sum tables of a screened run")
+    p.add_argument("screen_sum")
+    p.add_argument("calls")
+    p.add_argument("output")
+    p.add_argument("full_sum", nargs="?", help="Tier-2 sum table (absent if no contig was ambiguous)")
+    p.set_defaults(func=_phase_screen_merge)
+
+    p = steps.add_parser("screen-mark", help="Flag the rows of contigs called from the sampled triplets")
+    p.add_argument("pvalue_table")
+    p.add_argument("calls")
+    p.add_argument("output")
+    p.add_argument("--stride", type=_positive_int, required=True, help="Stride used by `kmers generate`")
+    p.set_defaults(func=_phase_screen_mark)
+
+    p = steps.add_parser("screen-report", help="K-mer savings of a screened run, and its agreement with a full run")
+    p.add_argument("calls")
+    p.add_argument("--screened", help="RSState table of the screened run")
+    p.add_argument("--reference", help="RSState table of a full-mode run on the same contigs")
+    p.set_defaults(func=_phase_screen_report)
+
+    # ==== binom ====
+    p = commands.add_parser("binom", help="Binomial test of the major phase, rows ranked by p-value")
+    p.add_argument("table", help="Table with P1, P2, P3 in columns 3-5")
+    p.add_argument("--memory-mb", type=_positive_int, default=512, help="Memory budget before spilling sorted runs to disk (default: 512)")
+    p.add_argument("--tmp-dir", default=None, help="Directory for sorted runs (default: system temp dir)")
+    p.add_argument("--top-k", type=_positive_int, default=None, help="Only output the K most significant rows")
+    p.set_defaults(func=_binom)
+
+    # ==== orf ====
+    orf = commands.add_parser("orf", help="ORF extraction from translated contigs")
+    steps = orf.add_subparsers(dest="step", metavar="STEP", required=True)
+
+    p = steps.add_parser("extract", help="Map peptides back to their contig nucleotide region")
+    p.add_argument("translation")
+    p.add_argument("contigs")
+    p.add_argument("output")
+    p.add_argument("mode", choices=["before_stop", "all"])
+    p.add_argument("min_peptide_len", nargs="?", type=_optional_int, default=0, help="Minimum peptide length, '' or 0 disables")
+    p.set_defaults(func=_orf_extract)
+
+    p = steps.add_parser("collapse", help="Deduplicate ORFs into a query FASTA plus provenance table")
+    p.add_argument("query_fasta")
+    p.add_argument("provenance")
+    p.add_argument("tables", nargs="+")
+    p.set_defaults(func=_orf_collapse)
+
+    # ==== merge ====
+    merge = commands.add_parser("merge", help="Final RS+ / RS- merge")
+    steps = merge.add_subparsers(dest="step", metavar="STEP", required=True)
+
+    p = steps.add_parser("plain", help="Merge without annotation")
+    p.add_argument("rsplus")
+    p.add_argument("provenance")
+    p.add_argument("rsminus")
+    p.add_argument("output")
+    p.set_defaults(func=_merge_plain)
+
+    p = steps.add_parser("annotated", help="Merge with the contig annotation")
+    p.add_argument("-f1", "--fich1", required=True, help="Path to KmersFromContigsQuerySumPhaseSeqTranslatedPvalueRSState file")
+    p.add_argument("-c", "--contigs", required=True, help="Path to ORFs_provenance.tsv (ORF_id -> peptide/contig occurrences of the RS+ ORFs)")
+    p.add_argument("-a", "--annotation", required=True, help="Path to merged_annotation file")
+    p.add_argument("-rsm", "--rsminus", required=True, help="Path to RS- file to include")
+    p.add_argument("-o", "--output", required=True, help="Path to save the final merged output file")
+    p.set_defaults(func=_merge_annotated)
+
+    # ==== plot ====
+    plot = commands.add_parser("plot", help="Per-contig plots")
+    steps = plot.add_subparsers(dest="step", metavar="STEP", required=True)
+    for name, func, help_text in [("phase", _plot_phase, "P1/P2/P3 bar plot per row of the p-value table"),
+                                  ("hist", _plot_hist, "Phase histogram of the k-mer sums per contig"),
+                                  ("dist", _plot_dist, "Per-sample k-mer count curves per contig")]:
+        p = steps.add_parser(name, help=help_text)
+        p.add_argument("input")
+        p.add_argument("output_dir")
+        p.set_defaults(func=func)
+
+    # ==== serve ====
+    p = commands.add_parser("serve", help="HTTP service mode (see `ribokast serve --help`)", add_help=False)
+    p.add_argument("server_args", nargs=argparse.REMAINDER)
+    p.set_defaults(func=_serve)
+
+    # ==== startup ====
+    p = commands.add_parser("startup", help="Measure interpreter + import startup time per subcommand")
+    p.add_argument("subcommands", nargs="*", help="Only these subcommands (e.g. kmers, 'plot dist')")
+    p.add_argument("--repeat", type=int, default=5, help="Runs per subcommand, best one reported (default: 5)")
+    p.set_defaults(func=_startup)
+
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # `serve` keeps its own parser; hand it everything after the subcommand
+    if argv[:1] == ["serve"]:
+        return _serve(argparse.Namespace(server_args=argv[1:]))
+    args = build_parser().parse_args(argv)
+    args.func(args)
@@ -0,0 +1,43 @@
+"""FASTA parsing shared by the RiboKast subcommands."""
+from .ribokast_io import open_text
+
+
+def iter_fasta_lines(lines):
+    """
+    Yield (id, sequence) records from FASTA lines.
+
+    The id is the header without '>'; multi-line sequences are joined and
+    blank lines skipped.
+    """
+    current_id = None
+    chunks = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(">"):
+            if current_id is not None:
+                yield current_id, "".join(chunks)
+            current_id = line[1:].strip()
+            chunks = []
+        elif current_id is not None:
+            chunks.append(line)
+    if current_id is not None:
+        yield current_id, "".join(chunks)
+
+
+def iter_fasta(file_path):
+    """Yield (id, sequence) records from a FASTA file (see iter_fasta_lines)."""
+    with open_text(file_path, "r") as fasta:
+        yield from iter_fasta_lines(fasta)
+
+
+def read_fasta(file_path):
+    """Return {id: sequence} in file order."""
+    return dict(iter_fasta(file_path))
+
+
+def read_fasta_ids(file_path):
+    """Return the record ids in file order (duplicates kept)."""
+    with open_text(file_path, "r") as fasta:
+        return [line.strip()[1:].strip() for line in fasta if line.startswith(">")]
@@ -0,0 +1,28 @@
+from .fasta import read_fasta
+from .ribokast_io import open_text
+
+# Function to generate k-mers from a given sequence
+def generate_kmers(sequence, k):
+    kmers = []
+    for i in range(0, len(sequence) - k + 1, 1):
+        kmers.append(sequence[i:i+k])
+    return kmers
+
+# k-mer i (1-based) belongs to phase triplet (i - 1) // 3; with stride > 1 only
+# every stride-th triplet is kept, under its original k-mer number
+def in_sampled_triplet(i, stride):
+    return (i - 1) // 3 % stride == 0
+
+# Function to write k-mers to an output file
+def write_kmers_to_file(sequences, output_file, k, stride=1):
+    with open_text(output_file, 'w') as f:
+        for sequence_id, sequence in sequences.items():
+            kmers = generate_kmers(sequence, k)
+            for i, kmer in enumerate(kmers, start=1):
+                if stride == 1 or in_sampled_triplet(i, stride):
+                    f.write(f">{sequence_id}_kmer_{i}\n{kmer}\n")
+    print("K-mers have been written to the file:", output_file)
+
+def generate_kmers_from_fasta(input_file, output_file, k, stride=1):
+    # Read the input file and write its k-mers; errors propagate so the step fails
+    write_kmers_to_file(read_fasta(input_file), output_file, k, stride)
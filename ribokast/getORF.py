@@ -1,5 +1,5 @@
-#!/usr/bin/env python3
-import sys
+from .fasta import read_fasta
+from .ribokast_io import open_text
 
 # ----------------------------
 # Peptide selection functions
@@ -75,23 +75,7 @@ def load_contig_sequences(file_path: str):
 
     Keys are contig IDs (header without '>').
     """
-    contig_sequences = {}
-    current_contig = None
-
-    with open(file_path, "r") as file:
-        for line in file:
-            line = line.strip()
-            if not line:
-                continue
-            if line.startswith(">"):
-                current_contig = line[1:].strip()
-                contig_sequences[current_contig] = ""
-            else:
-                if current_contig is None:
-                    continue
-                contig_sequences[current_contig] += line
-
-    return contig_sequences
+    return read_fasta(file_path)
 
 
 # ----------------------------
@@ -133,7 +117,7 @@ def process_translation(file_path: str):
     frames = {}
     current_frame = None
 
-    with open(file_path, "r") as file:
+    with open_text(file_path, "r") as file:
         for line in file:
             line = line.strip()
             if not line:
@@ -161,7 +145,7 @@ def process_peptides_before_stop(file_path: str):
     frames = {}
     current_frame = None
 
-    with open(file_path, "r") as file:
+    with open_text(file_path, "r") as file:
         for line in file:
             line = line.strip()
             if not line:
@@ -225,38 +209,122 @@ def map_to_contig_positions(peptides_by_frame: dict, contig_sequences: dict, min
 
 
 # ----------------------------
-# Main
+# Length filter / deduplication
 # ----------------------------
 
-def main():
-    if len(sys.argv) != 5:
-        print("Usage: python getORF.py <translation_file> <contig_fasta> <output_file> <mode>")
-        print("<mode>: 'before_stop' or 'all'")
-        sys.exit(1)
+def filter_by_peptide_length(mapped: dict, min_pep_len: int = 0):
+    """
+    Drop peptides shorter than min_pep_len AA (0 disables the filter).
+
+    Returns:
+      dict frame_header -> list of (peptide, nt_start, nt_end, nt_sequence, contig_id)
+    """
+    if min_pep_len <= 0:
+        return mapped
+    return {
+        frame: [entry for entry in pep_list if len(entry[0]) >= min_pep_len]
+        for frame, pep_list in mapped.items()
+    }
+
+
+def collapse_orfs(orf_rows):
+    """
+    Collapse identical ORF nucleotide sequences into unique query records.
+
+    orf_rows is an iterable of (frame, peptide, start_end, nt_sequence, contig_id).
+    The KaMRaT query only depends on the nucleotide sequence, so each distinct
+    sequence is queried once under an ORF_<n> id (first-seen order) and every
+    (peptide, contig) occurrence is kept in the provenance table.
 
-    translation_file = sys.argv[1]
-    contig_file = sys.argv[2]
-    output_file = sys.argv[3]
-    mode = sys.argv[4]
+    Returns:
+      (unique, provenance) with
+        unique:     list of (orf_id, nt_sequence)
+        provenance: list of (orf_id, peptide, nt_sequence, contig, frame, start_end)
+    """
+    orf_ids = {}
+    unique = []
+    provenance = []
+
+    for frame, peptide, start_end, seq, contig in orf_rows:
+        if not seq:
+            continue
+        orf_id = orf_ids.get(seq)
+        if orf_id is None:
+            orf_id = f"ORF_{len(orf_ids) + 1}"
+            orf_ids[seq] = orf_id
+            unique.append((orf_id, seq))
+        provenance.append((orf_id, peptide, seq, contig, frame, start_end))
 
-    contig_sequences = load_contig_sequences(contig_file)
+    return unique, provenance
 
+
+def read_orf_tables(table_files: list):
+    """
+    Yield (frame, peptide, start_end, nt_sequence, contig_id) rows from getORF
+    tables (Frame, Peptide, Start-End, Sequence, Contig).
+    """
+    for table_file in table_files:
+        with open_text(table_file, "r") as file:
+            next(file, None)  # header
+            for line in file:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) >= 5:
+                    yield tuple(fields[:5])
+
+
+def collapse(fasta_out: str, provenance_out: str, table_files: list):
+    """Write the unique ORF query FASTA and the provenance table for getORF tables."""
+    unique, provenance = collapse_orfs(read_orf_tables(table_files))
+
+    with open_text(fasta_out, "w") as out:
+        for orf_id, seq in unique:
+            out.write(f">{orf_id}\n{seq}\n")
+
+    with open_text(provenance_out, "w") as out:
+        out.write("ORF_id\tPeptide\tSequence\tContig\tFrame\tStart-End\n")
+        for row in provenance:
+            out.write("\t".join(row) + "\n")
+
+    print(f"Collapsed {len(provenance)} ORFs into {len(unique)} unique query sequences: {fasta_out}")
+
+
+# ----------------------------
+# Main
+# ----------------------------
+
+def orf_rows(translation_file: str, contig_sequences: dict, mode: str = "all", min_pep_len: int = 0):
+    """
+    Peptides of translated contigs mapped to their nucleotide region.
+
+    mode: 'before_stop' (peptide before the first stop only) or 'all'.
+
+    Returns:
+      list of (frame, peptide, start_end, nt_sequence, contig_id)
+    """
     if mode == "before_stop":
         selected = process_peptides_before_stop(translation_file)
-        mapped = map_to_contig_positions(selected, contig_sequences)
     elif mode == "all":
         selected = process_translation(translation_file)
-        mapped = map_to_contig_positions(selected, contig_sequences)
     else:
-        print("Invalid mode. Use 'before_stop' or 'all'.")
-        sys.exit(1)
+        raise ValueError("Invalid mode. Use 'before_stop' or 'all'.")
+    mapped = map_to_contig_positions(selected, contig_sequences)
 
-    with open(output_file, "w") as out:
-        out.write("Frame\tPeptide\tStart-End\tSequence\tContig\n")
-        for frame, pep_list in mapped.items():
-            for peptide, nt_start, nt_end, seq, contig in pep_list:
-                out.write(f"{frame}\t{peptide}\t{nt_start}-{nt_end}\t{seq}\t{contig}\n")
+    mapped = filter_by_peptide_length(mapped, min_pep_len)
+
+    return [(frame, peptide, f"{nt_start}-{nt_end}", seq, contig)
+            for frame, pep_list in mapped.items()
+            for peptide, nt_start, nt_end, seq, contig in pep_list]
 
 
-if __name__ == "__main__":
-    main()
+def extract_orfs(translation_file: str, contig_file: str, output_file: str, mode: str = "all", min_pep_len: int = 0):
+    """
+    Extract peptides from translated contigs and map them to their nucleotide region.
+
+    mode: 'before_stop' (peptide before the first stop only) or 'all'.
+    """
+    rows = orf_rows(translation_file, load_contig_sequences(contig_file), mode, min_pep_len)
+
+    with open_text(output_file, "w") as out:
+        out.write("Frame\tPeptide\tStart-End\tSequence\tContig\n")
+        for row in rows:
+            out.write("\t".join(row) + "\n")
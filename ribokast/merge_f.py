@@ -0,0 +1,58 @@
+import re
+from .ribokast_io import open_text
+
+
+def merge_annotated(fich1_path, provenance_path, annotation_path, rsminus_path, output_path):
+    """
+    Merge the RS+ ORF table (fanned out through ORFs_provenance.tsv) and the RS-
+    table with the contig annotation (joined on 'tag').
+    """
+    import pandas as pd
+
+    # ==== STEP 1: LOAD FILES ====
+    with open_text(fich1_path) as fh:
+        fich1 = pd.read_csv(fh, sep="\t", header=0, low_memory=False)
+    with open_text(provenance_path) as fh:
+        fich2 = pd.read_csv(fh, sep="\t", header=0)
+    with open_text(annotation_path) as fh:
+        df2 = pd.read_csv(fh, sep="\t")
+    with open_text(rsminus_path) as fh:
+        rsminus_df = pd.read_csv(fh, sep="\t")
+
+    # ==== STEP 2: PREPARE RS+ DATA ====
+    # The "peptide" column of fich1 holds the ORF_<n> query ids: fan each one back
+    # out to every (peptide, contig) occurrence recorded in the provenance table.
+    provenance = fich2[["ORF_id", "Peptide", "Contig"]].drop_duplicates()
+    fich1_filtered = fich1[["peptide", "RSState"]].rename(columns={"peptide": "ORF_id"})
+    fich1_filtered = fich1_filtered.merge(provenance, on="ORF_id", how="left")
+    fich1_filtered["peptide"] = fich1_filtered["Peptide"].fillna(fich1_filtered["ORF_id"])
+    fich1_filtered = fich1_filtered[["peptide", "RSState", "Contig"]]
+    fich1_filtered['Extracted_Contig'] = fich1_filtered['Contig'].astype(str).apply(lambda x: re.split(r'_', x)[0])
+    print(fich1_filtered)
+    rsplus_merged = fich1_filtered.merge(df2, left_on='Extracted_Contig', right_on='tag', how='left').fillna('NA')
+    rsplus_merged.rename(columns={"ID_contig": "peptide", "Contig": "ID"}, inplace=True)
+    rsplus_merged.drop(columns=["Extracted_Contig"], inplace=True)
+
+    # ==== STEP 3: PREPARE RS- DATA ====
+    # Faire la jointure sur 'tag' sans transformer 'contig'
+    rsminus_merged = rsminus_df.merge(df2, on='tag', how='left').fillna('NA')
+
+    # Restaurer la colonne 'contig' de rsminus_df (elle peut être écrasée lors du merge)
+    if 'contig' in rsminus_df.columns:
+        rsminus_merged['contig'] = rsminus_df['contig']
+
+    # Ajouter les colonnes manquantes si besoin
+    expected_columns = rsplus_merged.columns.tolist()
+    existing_columns = [col for col in expected_columns if col in rsminus_merged.columns]
+    missing_columns = [col for col in expected_columns if col not in rsminus_merged.columns]
+    for col in missing_columns:
+        rsminus_merged[col] = 'NA'
+    rsminus_merged = rsminus_merged[expected_columns]
+
+    # ==== STEP 4: CONCAT RS+ AND RS- ====
+    final_df = pd.concat([rsplus_merged, rsminus_merged], ignore_index=True)
+
+    # ==== STEP 5: OUTPUT ====
+    with open_text(output_path, "w") as fh:
+        final_df.to_csv(fh, sep="\t", index=False)
+    print(f"Processing complete. Merged output saved to {output_path}")
@@ -0,0 +1,66 @@
+import csv
+from .ribokast_io import open_text
+
+
+def index_provenance(rows):
+    """ORF_id -> [(contig_id, peptide), ...] from (ORF_id, peptide, contig) rows."""
+    orf_provenance = {}
+    for orf_id, peptide, contig in rows:
+        orf_id = orf_id.strip()
+        peptide = peptide.strip()
+        contig = contig.strip().lstrip('>')
+        if orf_id and peptide and contig:
+            occurrences = orf_provenance.setdefault(orf_id, [])
+            if (contig, peptide) not in occurrences:
+                occurrences.append((contig, peptide))
+    return orf_provenance
+
+
+def fan_out(header, rows, orf_provenance):
+    """Header and rows of the ORF-level RSState table, one row per (contig, peptide) of each ORF."""
+    data_rows = [['Contig_id'] + header[1:]]
+    for row in rows:
+        orf_id = row[1].strip()
+        for contig, peptide in orf_provenance.get(orf_id, [('UNKNOWN', orf_id)]):
+            data_rows.append([contig, peptide] + row[2:])
+    return data_rows
+
+
+def rs_minus_orf_row(col_count, contig, peptide):
+    """Row of a peptide from an RS- contig: contig, peptide, NA values."""
+    new_row = ['NA'] * col_count
+    new_row[0] = contig.strip().lstrip('>')
+    new_row[1] = peptide.strip()
+    new_row[-1] = 'RS-'  # RSState = last column
+    return new_row
+
+
+def merge_no_annotation(rsplus_input, rsplus_mapping, rsminus_file, output_path):
+    """
+    rsplus_input:   KmersFromContigsQuerySumPhaseSeqPvalueRSState
+    rsplus_mapping: ORFs_provenance.tsv (ORF_id -> peptide/contig occurrences)
+    rsminus_file:   contigsOfPeptides_RS-
+    output_path:    final output
+    """
+    # === Step 1: build ORF_id → [(contig_id, peptide), ...] provenance from RS+ ===
+    with open_text(rsplus_mapping) as map_file:
+        reader = csv.DictReader(map_file, delimiter='\t')
+        orf_provenance = index_provenance((row['ORF_id'], row['Peptide'], row['Contig']) for row in reader)
+
+    # === Step 2: process RS+ file and fan each ORF back out to its contigs ===
+    with open_text(rsplus_input) as infile:
+        reader = csv.reader(infile, delimiter='\t')
+        header = next(reader)
+        col_count = len(header)
+        data_rows = fan_out(header, reader, orf_provenance)
+
+    # === Step 3: process RS- ===
+    with open_text(rsminus_file) as f:
+        reader = csv.DictReader(f, delimiter='\t')
+        for row in reader:
+            data_rows.append(rs_minus_orf_row(col_count, row['Contig'], row['Peptide']))
+
+    # === Step 4: write the final combined file ===
+    with open_text(output_path, 'w') as out:
+        writer = csv.writer(out, delimiter='\t')
+        writer.writerows(data_rows)
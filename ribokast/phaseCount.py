@@ -1,5 +1,4 @@
-import pandas as pd
-import sys
+from .ribokast_io import open_text
 
 def process_contig_kmers(df, shift_value):
     results = {}  # Dictionary to store results by contig
@@ -60,21 +59,17 @@ def process_contig_kmers(df, shift_value):
 
     return results
 
-if __name__ == "__main__":
-    if len(sys.argv) < 3 or len(sys.argv) > 4:
-        print("Usage: python script.py input_file output_file [shift_value]")
-    else:
-        input_file = sys.argv[1]
-        output_file = sys.argv[2]
-        shift_value = sys.argv[3] if len(sys.argv) == 4 else '0'  # Default shift_value = '0'
+def phase_count(input_file, output_file, shift_value='0'):
+    import pandas as pd  # heavy, only needed here
 
-        df = pd.read_csv(input_file, sep='\t')
+    with open_text(input_file) as fh:
+        df = pd.read_csv(fh, sep='\t')
 
-        # Process the kmers by contig
-        results = process_contig_kmers(df, shift_value)
-        print(results)
-        # Write the results to the output file
-        with open(output_file, 'w') as out_file:
-            out_file.write("ID_contig\tP1\tP2\tP3\tDominant_Phase\tFunctional_dominant_phase\n")  # Change here
-            for contig, result in results.items():
-                out_file.write(f"{contig}\t{result['P1']}\t{result['P2']}\t{result['P3']}\t{result['Dominant_Phase']}\t{result['Functional_dominant_phase']}\n")
+    # Process the kmers by contig
+    results = process_contig_kmers(df, shift_value)
+    print(results)
+    # Write the results to the output file
+    with open_text(output_file, 'w') as out_file:
+        out_file.write("ID_contig\tP1\tP2\tP3\tDominant_Phase\tFunctional_dominant_phase\n")  # Change here
+        for contig, result in results.items():
+            out_file.write(f"{contig}\t{result['P1']}\t{result['P2']}\t{result['P3']}\t{result['Dominant_Phase']}\t{result['Functional_dominant_phase']}\n")
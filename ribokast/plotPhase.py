@@ -1,9 +1,9 @@
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
-import sys
+from .ribokast_io import open_text
 
 def plot_histogram(row, output_dir):
+    import matplotlib.pyplot as plt
+
     # Create the plot with a 3/2 aspect ratio
     fig, ax = plt.subplots(figsize=(6, 4))
 
@@ -22,19 +22,17 @@ def plot_histogram(row, output_dir):
     plt.savefig(output_file)
     plt.close(fig)  # Close the figure after saving
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python script.py input_file.csv output_directory")
-    else:
-        input_file = sys.argv[1]
-        output_dir = sys.argv[2]
+def plot_phase(input_file, output_dir):
+    """One bar plot of P1/P2/P3 per row of the p-value table."""
+    import pandas as pd
 
-        # Create the output directory if it doesn't exist
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+    # Create the output directory if it doesn't exist
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
 
-        df = pd.read_csv(input_file, sep='\t')
+    with open_text(input_file) as fh:
+        df = pd.read_csv(fh, sep='\t')
 
-        # Iterate over each row in the dataframe and create a plot for each
-        for index, row in df.iterrows():
-            plot_histogram(row, output_dir)
+    # Iterate over each row in the dataframe and create a plot for each
+    for index, row in df.iterrows():
+        plot_histogram(row, output_dir)
@@ -1,8 +1,8 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import sys
+from .ribokast_io import open_text
+
+def plot_customized_curve(group, output_file_combined, name, marker_size=10, bar_width=0.3, group_spacing=1):
+    import matplotlib.pyplot as plt
 
-def plot_customized_curve(group, output_file_combined, marker_size=10, bar_width=0.3, group_spacing=1):
     plt.figure(figsize=(10, 5))
 
     # Color-blind-friendly colors for P1, P2, P3
@@ -35,16 +35,14 @@ def plot_customized_curve(group, output_file_combined, marker_size=10, bar_width
     plt.savefig(output_file_combined)
     plt.close()
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python script.py input_file output_directory")
-    else:
-        input_file = sys.argv[1]
-        output_directory = sys.argv[2]
+def plot_phase_histograms(input_file, output_directory):
+    """One P1/P2/P3 bar histogram of the k-mer sums per contig."""
+    import pandas as pd
 
-        df = pd.read_csv(input_file, sep='\t')
-        contig_groups = df.groupby(df['id'].str.extract(r'(.+)_kmer_\d+', expand=False))
+    with open_text(input_file) as fh:
+        df = pd.read_csv(fh, sep='\t')
+    contig_groups = df.groupby(df['id'].str.extract(r'(.+)_kmer_\d+', expand=False))
 
-        for name, group in contig_groups:
-            output_file_combined = f"{output_directory}/{name}_plot_hist.png"
-            plot_customized_curve(group, output_file_combined, marker_size=4)
+    for name, group in contig_groups:
+        output_file_combined = f"{output_directory}/{name}_plot_hist.png"
+        plot_customized_curve(group, output_file_combined, name, marker_size=4)
@@ -1,8 +1,8 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import sys
+from .ribokast_io import open_text
+
+def plot_customized_curve(group, output_file_combined, name, initial_offset=40, offset_increment=10, sum_offset_increment=10, marker_size=10):
+    import matplotlib.pyplot as plt
 
-def plot_customized_curve(group, output_file_combined, initial_offset=40, offset_increment=10, sum_offset_increment=10, marker_size=10):
     plt.figure(figsize=(20, 8))  # Increase figure size
 
     # Plot count curves for each sample with vertical offset
@@ -33,16 +33,14 @@ def plot_customized_curve(group, output_file_combined, initial_offset=40, offset
     plt.savefig(output_file_combined)
     plt.close()
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python script.py input_file output_directory")
-    else:
-        input_file = sys.argv[1]
-        output_directory = sys.argv[2]
+def plot_distribution(input_file, output_directory):
+    """One per-sample count curve plot (plus the sum) per contig."""
+    import pandas as pd
 
-        df = pd.read_csv(input_file, sep='\t')
-        contig_groups = df.groupby(df['id'].str.extract(r'(.+)_kmer_\d+', expand=False))
+    with open_text(input_file) as fh:
+        df = pd.read_csv(fh, sep='\t')
+    contig_groups = df.groupby(df['id'].str.extract(r'(.+)_kmer_\d+', expand=False))
 
-        for name, group in contig_groups:
-            output_file_combined = f"{output_directory}/{name}_plot.png"
-            plot_customized_curve(group, output_file_combined, initial_offset=40, offset_increment=70, sum_offset_increment=20, marker_size=4)
+    for name, group in contig_groups:
+        output_file_combined = f"{output_directory}/{name}_plot.png"
+        plot_customized_curve(group, output_file_combined, name, initial_offset=40, offset_increment=70, sum_offset_increment=20, marker_size=4)
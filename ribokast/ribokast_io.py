@@ -0,0 +1,148 @@
+"""
+Shared text I/O for the RiboKast scripts.
+
+Files ending in .gz or .zst are (de)compressed transparently; anything else
+is opened as plain text. Compression goes through the multithreaded CLI
+tools (zstd -T, pigz -p) when they are on PATH, and falls back to the
+Python gzip / zstandard modules otherwise.
+
+Thread count comes from $COMPRESS_THREADS (0 = all cores), as set in config.sh.
+"""
+import gzip
+import io
+import os
+import shutil
+import signal
+import subprocess
+
+
+def codec_of(path):
+    """Return 'gz', 'zst' or None from the file extension."""
+    path = str(path)
+    if path.endswith(".zst"):
+        return "zst"
+    if path.endswith(".gz"):
+        return "gz"
+    return None
+
+
+def _threads():
+    try:
+        return int(os.environ.get("COMPRESS_THREADS", "0"))
+    except ValueError:
+        return 0
+
+
+def _command(codec, reading):
+    """CLI command streaming to/from stdout, or None if the tool is missing."""
+    threads = _threads()
+    if codec == "zst" and shutil.which("zstd"):
+        return ["zstd", "-q", "-dc"] if reading else ["zstd", "-q", "-c", f"-T{threads}"]
+    if codec == "gz" and shutil.which("pigz"):
+        cmd = ["pigz", "-dc"] if reading else ["pigz", "-c"]
+        if threads > 0:
+            cmd += ["-p", str(threads)]
+        return cmd
+    return None
+
+
+def _finish(proc, sink):
+    """Wait for the (de)compressor once its stream is closed."""
+    ret = proc.wait()
+    if sink is not None:
+        sink.close()
+    # A reader closed before EOF legitimately kills the tool with SIGPIPE
+    if ret != 0 and not (sink is None and ret == -signal.SIGPIPE):
+        raise IOError(f"{proc.args[0]} exited with status {ret}")
+
+
+class _PipeFile(io.TextIOWrapper):
+    """Text stream over a (de)compressor subprocess; close() waits for it."""
+
+    def __init__(self, proc, stream, sink=None):
+        super().__init__(stream, encoding="utf-8")
+        self._proc = proc
+        self._sink = sink
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            super().close()
+        finally:
+            _finish(self._proc, self._sink)
+
+
+class _PipeReader(io.BufferedReader):
+    """Binary stream over a decompressor subprocess; close() waits for it."""
+
+    def __init__(self, proc):
+        super().__init__(proc.stdout)
+        self._proc = proc
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            super().close()
+        finally:
+            _finish(self._proc, None)
+
+
+class _PipeWriter(io.BufferedWriter):
+    """Binary stream into a compressor subprocess; close() waits for it."""
+
+    def __init__(self, proc, sink):
+        super().__init__(proc.stdin)
+        self._proc = proc
+        self._sink = sink
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            super().close()
+        finally:
+            _finish(self._proc, self._sink)
+
+
+def open_text(path, mode="r"):
+    """
+    Open a file for reading ('r') or writing ('w'), compressed or not.
+
+    Usable anywhere a regular file object is: with-blocks, line iteration,
+    csv readers/writers and pandas read_csv/to_csv. With 'rb' / 'wb' the
+    (decompressed) bytes are read or written instead of text; readline()
+    and line iteration work the same.
+    """
+    codec = codec_of(path)
+    if codec is None:
+        return open(path, mode)
+
+    reading = "r" in mode
+    binary = "b" in mode
+    cmd = _command(codec, reading)
+
+    if cmd is not None:
+        if reading:
+            proc = subprocess.Popen(cmd + [str(path)], stdout=subprocess.PIPE, bufsize=0)
+            return _PipeReader(proc) if binary else _PipeFile(proc, io.BufferedReader(proc.stdout))
+        sink = open(path, "wb")
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=sink, bufsize=0)
+        return _PipeWriter(proc, sink) if binary else _PipeFile(proc, io.BufferedWriter(proc.stdin), sink)
+
+    if codec == "gz":
+        if binary:
+            return gzip.open(path, "rb" if reading else "wb")
+        return gzip.open(path, "rt" if reading else "wt", encoding="utf-8")
+
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(f"Cannot open {path}: install the 'zstd' CLI or the 'zstandard' Python module")
+    if reading:
+        stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    else:
+        cctx = zstandard.ZstdCompressor(threads=_threads() or -1)
+        stream = io.BufferedWriter(cctx.stream_writer(open(path, "wb"), closefd=True))
+    return stream if binary else io.TextIOWrapper(stream, encoding="utf-8")
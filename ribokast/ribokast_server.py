@@ -0,0 +1,390 @@
+"""
+RiboKast service mode: keep the index backend and the Python phase /
+translation / statistics code loaded, and score FASTA batches over HTTP.
+
+    POST /score   body = FASTA   -> JSON {"rsstate": <tsv>, "orfs": <tsv>, ...}
+    GET  /health                 -> JSON {"status": "ok", ...}
+
+"rsstate" has the columns of KmersFromContigsQuerySumPhaseSeqTranslatedPvalueRSState
+and "orfs" those of ORFs_RSState.tsv, i.e. the outputs of RiboKast_cont_orf.sh
+(without annotation) for the submitted contigs. Scoring goes through the same
+phase counting, binomial test, RSState, ORF extraction and merge functions as
+the batch pipeline, and translation through the same seqkit command.
+
+Backends:
+  kamrat  runs `kamrat query` from the Singularity image against INDEX_DIR
+  table   in-memory k-mer count table (KaMRaT query layout: tag, sample1, ...),
+          meant for small indexes and local testing
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .addRSState import add_state_column, rs_minus_row
+from .binom_test import determine_major_phase
+from .fasta import iter_fasta, iter_fasta_lines
+from .generate_kmers_fromFasta import generate_kmers
+from .getORF import collapse_orfs, orf_rows
+from .merge_no_ann import fan_out, index_provenance, rs_minus_orf_row
+from .phaseCount import process_contig_kmers
+from .ribokast_io import open_text
+
+# ----------------------------
+# Translation (translate_st.sh / ORFpred.sh)
+# ----------------------------
+
+def write_fasta(records, file_path):
+    with open(file_path, "w") as f:
+        for rid, seq in records:
+            f.write(f">{rid}\n{seq}\n")
+
+
+def seqkit_translate(fasta_in, frames, out_file):
+    """`seqkit translate -F` of fasta_in in the given frames, as the pipeline runs it."""
+    with open(out_file, "w") as out:
+        subprocess.run(["seqkit", "translate", "-F", "-f", ",".join(str(f) for f in frames), fasta_in,
+                        "--line-width", "7000"], check=True, stdout=out)
+
+
+class BadRequest(ValueError):
+    """Request body that cannot be scored (answered with HTTP 400)."""
+
+
+def parse_fasta(body):
+    """
+    Return [(id, sequence), ...] from a FASTA request body, ids as in the
+    pipeline (whole header). Raises BadRequest on invalid UTF-8, records
+    without id or sequence, and duplicate ids.
+    """
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise BadRequest(f"request body is not UTF-8 text ({e.reason} at byte {e.start})") from None
+    records = list(iter_fasta_lines(text.splitlines()))
+    if not records:
+        raise BadRequest("empty or invalid FASTA")
+    seen = set()
+    for rid, seq in records:
+        if not rid:
+            raise BadRequest("FASTA header without an id")
+        if not seq:
+            raise BadRequest(f"record {rid} has no sequence")
+        if rid in seen:
+            raise BadRequest(f"duplicate id {rid}")
+        seen.add(rid)
+    return records
+
+
+# ----------------------------
+# Query backends
+# ----------------------------
+
+class KamratBackend:
+    """Query INDEX_DIR with `kamrat query` through apptainer, one call per query."""
+
+    def __init__(self, index_dir, sif_file, toquery="mean", counts="float", withabsent=True,
+                 binds=("/store:/store", "/data:/data"), tmp_dir=None):
+        self.index_dir = index_dir
+        self.sif_file = sif_file
+        self.toquery = toquery
+        self.counts = counts
+        self.withabsent = withabsent
+        self.binds = binds
+        self.tmp_dir = tmp_dir
+
+    def query(self, records):
+        with tempfile.TemporaryDirectory(dir=self.tmp_dir) as tmp:
+            fasta_in = os.path.join(tmp, "query.fa")
+            out_file = os.path.join(tmp, "out")
+            write_fasta(records, fasta_in)
+
+            cmd = ["apptainer", "exec"]
+            for bind in self.binds:
+                cmd += ["-B", bind]
+            cmd += [self.sif_file, "kamrat", "query", "-idxdir", self.index_dir, "-fasta", fasta_in,
+                    "-toquery", self.toquery, "-outpath", out_file, "-counts", self.counts]
+            if self.withabsent:
+                cmd.append("-withabsent")
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+
+            with open(out_file) as f:
+                samples = f.readline().rstrip("\n").split("\t")[1:]
+                values = [[float(v) for v in line.rstrip("\n").split("\t")[1:]] for line in f]
+
+        if len(values) != len(records):
+            raise RuntimeError(f"kamrat returned {len(values)} rows for {len(records)} sequences")
+        return samples, values
+
+
+class TableBackend:
+    """In-memory k-mer count table with the same aggregation as `kamrat query -withabsent`."""
+
+    def __init__(self, table_file, toquery="mean"):
+        self.toquery = toquery
+        self.counts = {}
+        with open_text(table_file) as f:
+            self.samples = f.readline().rstrip("\n").split("\t")[1:]
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                self.counts[fields[0].upper()] = [float(v) for v in fields[1:]]
+        self.k = len(next(iter(self.counts))) if self.counts else 0
+
+    def query(self, records):
+        absent = [0.0] * len(self.samples)
+        aggregate = statistics.median if self.toquery == "median" else statistics.fmean
+        values = []
+        for _, seq in records:
+            kmers = generate_kmers(seq.upper(), self.k)
+            rows = [self.counts.get(kmer, absent) for kmer in kmers] or [absent]
+            values.append([aggregate(col) for col in zip(*rows)])
+        return self.samples, values
+
+
+# ----------------------------
+# Batch scoring (run_RiboKast.sh + ORFpred.sh + merge_no_ann.py)
+# ----------------------------
+
+class RiboKastScorer:
+
+    def __init__(self, backend, kmer_len, phase_shift="0", peptide_len_min=9, significance=0.05, tmp_dir=None):
+        self.backend = backend
+        self.kmer_len = kmer_len
+        self.phase_shift = phase_shift
+        self.peptide_len_min = peptide_len_min
+        self.significance = significance
+        self.tmp_dir = tmp_dir
+
+    def rs_state(self, records, translate_contigs, tmp):
+        """
+        Contig-level RS state for [(id, seq), ...].
+
+        Returns (header, rows) shaped like the *PvalueRSState tables: RS+ rows
+        sorted by p-value (ties in contig id order), then RS- rows with NA values.
+        """
+        _, values = self.backend.query(records) if records else ([], [])
+        rs_plus = [(rid, seq) for (rid, seq), v in zip(records, values) if sum(v) != 0]
+        rs_minus = [(rid, seq) for (rid, seq), v in zip(records, values) if sum(v) == 0]
+
+        header = ["contig", "ID_contig", "P1", "P2", "P3", "Dominant_Phase", "Functional_dominant_phase"]
+        if translate_contigs:
+            header.append("translated_seq")
+        rows = []
+
+        if rs_plus:
+            kmer_ids, kmer_seqs = [], []
+            for rid, seq in rs_plus:
+                for i, kmer in enumerate(generate_kmers(seq, self.kmer_len), start=1):
+                    kmer_ids.append(f"{rid}_kmer_{i}")
+                    kmer_seqs.append(kmer)
+            phases = {}
+            if kmer_ids:
+                import pandas as pd  # heavy, only needed here (phaseCount)
+
+                _, kmer_values = self.backend.query(list(zip(kmer_ids, kmer_seqs)))
+                df = pd.DataFrame({"id": kmer_ids, "sum": [sum(v) for v in kmer_values]})
+                phases = process_contig_kmers(df, self.phase_shift)
+
+            # phaseCount order (contig id), sequences added as add_colContFromFastaFile_arg
+            sequences = dict(rs_plus)
+            for rid, res in phases.items():
+                rows.append([sequences[rid], rid, str(res["P1"]), str(res["P2"]), str(res["P3"]),
+                             res["Dominant_Phase"], str(res["Functional_dominant_phase"])])
+            if translate_contigs:
+                self._translate_rows(rows, tmp)
+
+        table = determine_major_phase([header] + rows)
+        header, rows = add_state_column(table[0], table[1:], self.significance)
+        rows += [rs_minus_row(header, seq, rid) for rid, seq in rs_minus]
+        return header, rows
+
+    def _translate_rows(self, rows, tmp):
+        """Append the translation in the functional dominant phase (translate_st.sh)."""
+        fasta_in = os.path.join(tmp, "translate.fa")
+        translated = os.path.join(tmp, "translate.pep.fa")
+        write_fasta([(row[1], row[0]) for row in rows], fasta_in)
+        frames = sorted({int(row[6]) for row in rows})
+        seqkit_translate(fasta_in, frames, translated)
+        # seqkit writes each record in each requested frame, in that order
+        proteins = iter([seq for _, seq in iter_fasta(translated)])
+        by_frame = {}
+        for row in rows:
+            for frame in frames:
+                by_frame[(row[1], frame)] = next(proteins)
+        for row in rows:
+            row.append(by_frame[(row[1], int(row[6]))])
+
+    def score(self, records):
+        """Score one FASTA batch; returns (rsstate_header, rsstate_rows, orf_header, orf_rows)."""
+        with tempfile.TemporaryDirectory(dir=self.tmp_dir) as tmp:
+            return self._score(records, tmp)
+
+    def _score(self, records, tmp):
+        contig_header, contig_rows = self.rs_state(records, True, tmp)
+
+        # ==== ORFpred.sh: RS+P+ translated in the predicted frame, RS+P- / RS- in three frames ====
+        paths = {name: os.path.join(tmp, name) for name in
+                 ("RS+P+.fa", "RS+P+_pep.fa", "RS+P-.fa", "RS+P-_pep.fa", "RS-.fa", "RS-_pep.fa")}
+        write_fasta([(row[1], row[0]) for row in contig_rows if row[-1] == "RS+P+"], paths["RS+P+.fa"])
+        write_fasta([(f"{row[1]}_pep", row[7]) for row in contig_rows if row[-1] == "RS+P+"], paths["RS+P+_pep.fa"])
+        write_fasta([(row[1], row[0]) for row in contig_rows if row[-1] == "RS+P-"], paths["RS+P-.fa"])
+        write_fasta([(row[1], row[0]) for row in contig_rows if row[-1] == "RS-"], paths["RS-.fa"])
+        seqkit_translate(paths["RS+P-.fa"], (1, 2, 3), paths["RS+P-_pep.fa"])
+        seqkit_translate(paths["RS-.fa"], (1, 2, 3), paths["RS-_pep.fa"])
+
+        def orfs(translation, contigs):
+            return orf_rows(paths[translation], dict(iter_fasta(paths[contigs])), "all", self.peptide_len_min or 0)
+
+        rs_plus_orfs = orfs("RS+P+_pep.fa", "RS+P+.fa") + orfs("RS+P-_pep.fa", "RS+P-.fa")
+        rs_minus_orfs = orfs("RS-_pep.fa", "RS-.fa")
+
+        # ==== -orf pass on the unique ORF sequences, fanned back out (merge_no_ann.py) ====
+        unique, provenance = collapse_orfs(rs_plus_orfs)
+        orf_header, rows = self.rs_state(unique, False, tmp)
+        merged = fan_out(orf_header, rows,
+                         index_provenance((orf_id, peptide, contig) for orf_id, peptide, _, contig, _, _ in provenance))
+        for _, peptide, _, _, contig in rs_minus_orfs:
+            merged.append(rs_minus_orf_row(len(orf_header), contig, peptide))
+
+        return contig_header, contig_rows, merged[0], merged[1:]
+
+
+def to_tsv(header, rows):
+    return "".join("\t".join(row) + "\n" for row in [header] + rows)
+
+
+# ----------------------------
+# HTTP service
+# ----------------------------
+
+class RiboKastService:
+    """Bounded queue in front of a fixed pool of scoring workers."""
+
+    def __init__(self, scorer, workers=2, queue_size=8, max_body=64 * 1024 * 1024):
+        self.scorer = scorer
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_body = max_body
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.done = 0
+
+    def submit(self, records):
+        """Run a batch; returns None if the queue is full."""
+        if not self.slots.acquire(blocking=False):
+            return None
+        with self.lock:
+            self.pending += 1
+        try:
+            return self.pool.submit(self.scorer.score, records).result()
+        finally:
+            with self.lock:
+                self.pending -= 1
+                self.done += 1
+            self.slots.release()
+
+    def status(self):
+        with self.lock:
+            return {"status": "ok", "workers": self.workers, "queue_size": self.queue_size,
+                    "pending": self.pending, "done": self.done}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, self.service.status())
+        else:
+            self._reply(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._reply(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._reply(411, {"error": "Content-Length required"})
+            return
+        if length < 0 or length > self.service.max_body:
+            self.close_connection = True
+            self._reply(413, {"error": f"request body of {length} bytes, the limit is {self.service.max_body}"})
+            return
+        try:
+            records = parse_fasta(self.rfile.read(length))
+        except BadRequest as e:
+            self._reply(400, {"error": str(e)})
+            return
+        try:
+            result = self.service.submit(records)
+        except Exception as e:
+            self._reply(500, {"error": str(e)})
+            return
+        if result is None:
+            self._reply(503, {"error": "queue full, retry later"})
+            return
+        contig_header, contig_rows, orf_header, orf_rows = result
+        self._reply(200, {"n_contigs": len(records),
+                          "rsstate": to_tsv(contig_header, contig_rows),
+                          "orfs": to_tsv(orf_header, orf_rows)})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ribokast serve", description="RiboKast service mode: score FASTA batches over HTTP.")
+    parser.add_argument("--backend", choices=["kamrat", "table"], default="kamrat", help="Query backend")
+    parser.add_argument("--index", help="KaMRaT index directory (kamrat backend)")
+    parser.add_argument("--sif", help="KaMRaT Singularity image (kamrat backend)")
+    parser.add_argument("--kmer-table", help="K-mer count table: tag, sample1, ... (table backend)")
+    parser.add_argument("--kmer-len", type=int, default=25, help="K-mer length of the index")
+    parser.add_argument("--phase-shift", default="0", help="Phase shift ('0', '+1' or '-1')")
+    parser.add_argument("--peptide-len-min", type=int, default=9, help="Minimum peptide length (0 disables)")
+    parser.add_argument("--toquery", choices=["mean", "median"], default="mean")
+    parser.add_argument("--counts", choices=["int", "float"], default="float")
+    parser.add_argument("--no-withabsent", action="store_true", help="Do not pass -withabsent to kamrat")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="Batches scored concurrently")
+    parser.add_argument("--queue-size", type=int, default=8, help="Batches allowed to wait for a worker")
+    parser.add_argument("--max-body-mb", type=float, default=64, help="Largest accepted request body (MB)")
+    parser.add_argument("--tmp-dir", help="Directory for per-batch temporary files")
+    args = parser.parse_args(argv)
+
+    if args.backend == "kamrat":
+        if not args.index or not args.sif:
+            parser.error("--index and --sif are required with --backend kamrat")
+        backend = KamratBackend(args.index, args.sif, args.toquery, args.counts, not args.no_withabsent,
+                                tmp_dir=args.tmp_dir)
+    else:
+        if not args.kmer_table:
+            parser.error("--kmer-table is required with --backend table")
+        backend = TableBackend(args.kmer_table, args.toquery)
+
+    scorer = RiboKastScorer(backend, args.kmer_len, args.phase_shift, args.peptide_len_min, tmp_dir=args.tmp_dir)
+    RequestHandler.service = RiboKastService(scorer, args.workers, args.queue_size, int(args.max_body_mb * 1024 * 1024))
+
+    server = ThreadingHTTPServer((args.host, args.port), RequestHandler)
+    print(f"RiboKast service listening on http://{args.host}:{args.port} (backend: {args.backend})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
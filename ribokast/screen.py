@@ -0,0 +1,248 @@
+"""
+Two-tier phase screening.
+
+Tier 1 queries only every stride-th triplet of k-mers of each RS+ contig
+(`ribokast kmers generate --stride`). From the phase votes of those triplets
+the contig is called early when the full-resolution test cannot plausibly
+disagree:
+
+  - the major-phase fraction q of the sampled votes gets a Wilson interval
+    at the screening confidence level;
+  - the full-mode vote count is estimated as votes * triplets / sampled;
+  - RS+P+ if even the lower bound of q is significant at that count (and the
+    sampled votes alone are significant, so the downstream binomial test on
+    the sampled k-mers gives the same call);
+  - RS+P- if even the upper bound of q is not significant;
+  - ambiguous otherwise, or with fewer than min_votes sampled votes.
+
+Ambiguous contigs go through tier 2 with all their k-mers. Called contigs
+keep their tier-1 rows in KmersFromContigsQuerySum, so their P1/P2/P3 and
+p_value are those of the sampled triplets: mark_screened flags them in the
+Pvalue table (screened = yes, screen_stride = the stride), as they are not
+comparable with the full-resolution rows.
+"""
+import math
+import sys
+from itertools import groupby
+from statistics import NormalDist
+
+from .binom_test import major_pvalue
+from .fasta import read_fasta
+from .generate_kmers_fromFasta import in_sampled_triplet
+from .ribokast_io import open_text
+from .sum_index import SumIndexBuilder
+
+SCREEN_COLUMNS = ["screened", "screen_stride"]
+CALLS_HEADER = ["contig", "kmers", "kmers_sampled", "P1", "P2", "P3", "votes_full_est",
+                "p_sampled", "p_full_min", "p_full_max", "call"]
+AMBIGUOUS = "ambiguous"
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+
+def contig_of(kmer_id):
+    """'<contig>_kmer_<i>' -> ('<contig>', i)."""
+    contig, index = kmer_id.rsplit("_kmer_", 1)
+    return contig, int(index)
+
+
+def iter_contig_rows(table):
+    """Yield (contig, rows) for each run of rows of a KmersFromContigsQuerySum table."""
+    return groupby((line.rstrip("\n").split("\t") for line in table), key=lambda row: contig_of(row[0])[0])
+
+
+def triplet_votes(rows):
+    """
+    P1/P2/P3 votes of a contig: in each triplet the k-mer with the largest sum
+    (first on ties) votes for its phase, as in phaseCount.
+    """
+    votes = [0, 0, 0]
+    triplets = groupby(rows, key=lambda row: (contig_of(row[0])[1] - 1) // 3)
+    for _, triplet in triplets:
+        sums = [float(row[-1]) for row in triplet]
+        if any(sums):
+            votes[sums.index(max(sums))] += 1
+    return votes
+
+
+def wilson_interval(k, n, z):
+    centre = (k + z * z / 2) / (n + z * z)
+    half = z * math.sqrt(k * (n - k) / n + z * z / 4) / (n + z * z)
+    return centre - half, centre + half
+
+
+def call_contig(votes, n_kmers, stride, confidence=0.999, min_votes=10, alpha=0.05):
+    """Return (votes_full_est, p_sampled, p_full_min, p_full_max, call) for one contig."""
+    n = sum(votes)
+    k = max(votes)
+    p_sampled = major_pvalue(k, n)
+    if n < max(min_votes, 1):
+        return "NA", p_sampled, "NA", "NA", AMBIGUOUS
+
+    triplets = math.ceil(n_kmers / 3)
+    sampled = math.ceil(triplets / stride)
+    n_full = n * triplets / sampled
+
+    z = NormalDist().inv_cdf(confidence)
+    low, high = wilson_interval(k, n, z)
+    # The full-mode major phase holds at least a third of the votes
+    low, high = max(low, 1 / 3), max(high, 1 / 3)
+    n_est = round(n_full)
+    p_full_min = major_pvalue(round(high * n_est), n_est)
+    p_full_max = major_pvalue(round(low * n_est), n_est)
+
+    if float(p_full_max) < alpha and float(p_sampled) < alpha:
+        call = "RS+P+"
+    elif float(p_full_min) >= alpha:
+        call = "RS+P-"
+    else:
+        call = AMBIGUOUS
+    return str(n_est), p_sampled, p_full_min, p_full_max, call
+
+
+# ----------------------------
+# Tier 1 -> tier 2
+# ----------------------------
+
+def screen(sum_file, contig_fasta, calls_out, ambiguous_fasta, k, stride,
+           confidence=0.999, min_votes=10):
+    """
+    Call the contigs of contig_fasta from the tier-1 sum table, write the
+    per-contig calls table and the FASTA of the contigs left for tier 2.
+    """
+    sequences = read_fasta(contig_fasta)
+    votes = {}
+    with open_text(sum_file) as table:
+        table.readline()
+        for contig, rows in iter_contig_rows(table):
+            votes[contig] = triplet_votes(rows)
+
+    counts = {"RS+P+": 0, "RS+P-": 0, AMBIGUOUS: 0}
+    with open_text(calls_out, "w") as calls, open_text(ambiguous_fasta, "w") as ambiguous:
+        calls.write("\t".join(CALLS_HEADER) + "\n")
+        for contig, sequence in sequences.items():
+            n_kmers = max(len(sequence) - k + 1, 0)
+            n_sampled = sum(1 for i in range(1, n_kmers + 1) if in_sampled_triplet(i, stride))
+            contig_votes = votes.get(contig, [0, 0, 0])
+            decision = call_contig(contig_votes, n_kmers, stride, confidence, min_votes)
+            counts[decision[-1]] += 1
+            calls.write("\t".join([contig, str(n_kmers), str(n_sampled)]
+                                  + [str(v) for v in contig_votes] + list(decision)) + "\n")
+            if decision[-1] == AMBIGUOUS:
+                ambiguous.write(f">{contig}\n{sequence}\n")
+
+    print(f"Screening: {counts['RS+P+']} RS+P+, {counts['RS+P-']} RS+P- called from sampled triplets, "
+          f"{counts[AMBIGUOUS]} ambiguous left for the full query")
+
+
+def called_contigs(calls_file):
+    """Contigs called from the sampled triplets (not ambiguous) in a calls table."""
+    with open_text(calls_file) as calls:
+        calls.readline()
+        return {line.split("\t", 1)[0] for line in calls if line.rstrip("\n").split("\t")[-1] != AMBIGUOUS}
+
+
+def merge_sums(screen_sum, calls_file, output_file, full_sum=None):
+    """
+    KmersFromContigsQuerySum of a screened run: tier-1 rows of the called
+    contigs and tier-2 rows of the ambiguous ones, in tier-1 (RS+.fa) order,
+    with its per-contig offset index.
+    """
+    called = called_contigs(calls_file)
+
+    builder = SumIndexBuilder()
+    with open_text(screen_sum) as screened, open_text(output_file, "w") as out:
+        header = screened.readline()
+        out.write(header)
+        builder.add_header(header)
+        full_groups = iter(())
+        if full_sum is not None:
+            full = open_text(full_sum)
+            full.readline()
+            full_groups = iter_contig_rows(full)
+        try:
+            for contig, rows in iter_contig_rows(screened):
+                if contig not in called:
+                    full_contig, rows = next(full_groups, (None, None))
+                    if full_contig != contig:
+                        raise ValueError(f"{full_sum}: expected rows of {contig}, got {full_contig}")
+                for row in rows:
+                    line = "\t".join(row) + "\n"
+                    out.write(line)
+                    builder.add(line)
+        finally:
+            if full_sum is not None:
+                full.close()
+    builder.write(output_file)
+
+
+def mark_screened(table_file, calls_file, output_file, stride):
+    """
+    Append the screened (yes / no) and screen_stride columns to a Pvalue
+    table (id in column 2) of a screened run.
+    """
+    called = called_contigs(calls_file)
+    with open_text(table_file) as table, open_text(output_file, "w") as out:
+        out.write(table.readline().rstrip("\n") + "\t" + "\t".join(SCREEN_COLUMNS) + "\n")
+        for line in table:
+            row = line.rstrip("\n").split("\t")
+            screened = ["yes", str(stride)] if row[1] in called else ["no", "1"]
+            out.write("\t".join(row + screened) + "\n")
+
+
+# ----------------------------
+# Report
+# ----------------------------
+
+def _rs_states(file_path):
+    """Contig/ORF id (column 2) -> RSState (last column) of an RSState table."""
+    with open_text(file_path) as table:
+        table.readline()
+        return {row[1]: row[-1] for row in (line.rstrip("\n").split("\t") for line in table)}
+
+
+def screen_report(calls_file, screened=None, reference=None, out=None):
+    """
+    Query savings of a screened run and, given the RSState tables of the
+    screened run and of a full-mode run, the agreement of the calls.
+    """
+    out = out or sys.stdout
+
+    with open_text(calls_file) as calls:
+        header = calls.readline().rstrip("\n").split("\t")
+        rows = [dict(zip(header, line.rstrip("\n").split("\t"))) for line in calls]
+
+    full_kmers = sum(int(r["kmers"]) for r in rows)
+    tier1 = sum(int(r["kmers_sampled"]) for r in rows)
+    tier2 = sum(int(r["kmers"]) for r in rows if r["call"] == AMBIGUOUS)
+    queried = tier1 + tier2
+    out.write(f"contigs\t{len(rows)}\n")
+    for call in ("RS+P+", "RS+P-", AMBIGUOUS):
+        out.write(f"{call}\t{sum(1 for r in rows if r['call'] == call)}\n")
+    out.write(f"kmers_full_mode\t{full_kmers}\n")
+    out.write(f"kmers_tier1\t{tier1}\n")
+    out.write(f"kmers_tier2\t{tier2}\n")
+    out.write(f"kmer_reduction\t{full_kmers / queried if queried else float('nan'):.2f}x\n")
+
+    if screened is None or reference is None:
+        return
+
+    got = _rs_states(screened)
+    expected = _rs_states(reference)
+    called_early = {r["contig"] for r in rows if r["call"] != AMBIGUOUS}
+    ids = sorted(set(got) | set(expected))
+    agree = sum(1 for i in ids if got.get(i) == expected.get(i))
+    early = [i for i in ids if i in called_early]
+    early_agree = sum(1 for i in early if got.get(i) == expected.get(i))
+    out.write(f"agreement_all\t{agree}/{len(ids)}\n")
+    out.write(f"agreement_tier1_calls\t{early_agree}/{len(early)}\n")
+
+    # Confusion matrix, rows = full mode, columns = screened
+    states = sorted({s for s in list(got.values()) + list(expected.values())} | {"missing"})
+    out.write("full\\screened\t" + "\t".join(states) + "\n")
+    for ref_state in states:
+        cells = [sum(1 for i in ids if expected.get(i, "missing") == ref_state and got.get(i, "missing") == s)
+                 for s in states]
+        out.write(ref_state + "\t" + "\t".join(str(c) for c in cells) + "\n")
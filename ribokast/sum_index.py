@@ -0,0 +1,221 @@
+"""
+Sidecar index of KmersFromContigsQuerySum tables.
+
+<table>.idx holds, for each contig, the byte offset of its first row in the
+table, the byte length of its rows and their number:
+
+    contig  offset  length  rows
+
+Rows of a contig are contiguous (k-mers are written contig by contig), so the
+rows of a few contigs are read by seeking straight to them. For .gz / .zst
+tables the offsets refer to the decompressed text: the reader decompresses
+up to the last selected contig and discards the bytes in between unparsed.
+
+The index is optional: a table whose contig rows are split (a contig id used
+twice in the FASTA, not next to each other) gets none, with a warning, and
+select_contigs scans it instead.
+"""
+import os
+import sys
+
+from .ribokast_io import codec_of, open_text
+
+INDEX_HEADER = "contig\toffset\tlength\trows\n"
+_SKIP_BLOCK = 1 << 20
+
+
+def index_path(table):
+    return f"{table}.idx"
+
+
+def _contig(line):
+    return line.split("\t", 1)[0].rstrip("\n").rsplit("_kmer_", 1)[0]
+
+
+class SumIndexBuilder:
+    """
+    Record contig offsets while a sum table is written line by line.
+
+    Rows that break contiguity stop the recording (error is set) instead of
+    failing the step writing the table; write() then leaves no index.
+    """
+
+    def __init__(self):
+        self.offset = 0
+        self.entries = []  # [contig, offset, length, rows]
+        self.error = None
+        self._seen = set()
+
+    def add_header(self, line):
+        self.offset += len(line.encode("utf-8"))
+
+    def add(self, line):
+        self.add_row(_contig(line), len(line.encode("utf-8")))
+
+    def add_row(self, contig, size):
+        self.add_entry(contig, self.offset, size, 1)
+        self.offset += size
+
+    def add_entry(self, contig, offset, length, rows):
+        if self.error:
+            return
+        last = self.entries[-1] if self.entries else None
+        if last and last[0] == contig and last[1] + last[2] == offset:
+            last[2] += length
+            last[3] += rows
+        elif contig in self._seen:
+            self.error = f"rows of {contig} are not contiguous"
+            self.entries = []
+        else:
+            self._seen.add(contig)
+            self.entries.append([contig, offset, length, rows])
+
+    def write(self, table):
+        """Write <table>.idx; without a usable index, warn and remove any stale one."""
+        path = index_path(table)
+        if self.error:
+            print(f"[WARN] {self.error}: {table} is not indexed, `ribokast kmers select` will scan it",
+                  file=sys.stderr)
+            if os.path.exists(path):
+                os.remove(path)
+            return False
+        with open(path, "w") as out:
+            out.write(INDEX_HEADER)
+            for contig, offset, length, rows in self.entries:
+                out.write(f"{contig}\t{offset}\t{length}\t{rows}\n")
+        return True
+
+
+def build_index(table):
+    """Index an existing table (one pass over it); False if it cannot be indexed."""
+    builder = SumIndexBuilder()
+    with open_text(table, "rb") as raw:
+        builder.offset = len(raw.readline())
+        for line in raw:
+            contig = line.split(b"\t", 1)[0].rstrip(b"\n").rsplit(b"_kmer_", 1)[0]
+            builder.add_row(contig.decode("utf-8"), len(line))
+            if builder.error:
+                break
+    return builder.write(table)
+
+
+def merge_chunk_indexes(table, chunk_tables):
+    """
+    Index of a table made of chunk_tables concatenated with a single header
+    (run_RiboKast.sh concat_chunks), from the chunk indexes.
+    """
+    builder = SumIndexBuilder()
+    for n, chunk in enumerate(chunk_tables):
+        if not os.path.exists(index_path(chunk)):
+            builder.error = f"{chunk} has no index"
+            break
+        with open_text(chunk) as fh:
+            header = fh.readline()
+        header_size = len(header.encode("utf-8"))
+        if n == 0:
+            builder.add_header(header)
+        base = builder.offset - header_size
+        for contig, offset, length, rows in read_index(chunk):
+            builder.add_entry(contig, base + offset, length, rows)
+            builder.offset = base + offset + length
+    return builder.write(table)
+
+
+def read_index(table):
+    """[(contig, offset, length, rows)] in table order."""
+    with open(index_path(table)) as fh:
+        fh.readline()
+        entries = []
+        for line in fh:
+            try:
+                contig, offset, length, rows = line.rstrip("\n").split("\t")
+                entries.append((contig, int(offset), int(length), int(rows)))
+            except ValueError:
+                raise _stale(table, f"malformed index line {line.rstrip()!r}") from None
+    return entries
+
+
+def _read_exact(raw, size):
+    chunks = []
+    while size > 0:
+        chunk = raw.read(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _stale(table, reason):
+    return ValueError(f"{index_path(table)} does not match {table} ({reason}); "
+                      f"rebuild it with `ribokast kmers index {table}`")
+
+
+def iter_contigs(table, contigs):
+    """
+    Yield (contig, text of its rows) for the requested contigs, in table
+    order, reading only their byte ranges. Unknown contigs are reported on
+    stderr and skipped.
+    """
+    wanted = set(contigs)
+    entries = read_index(table)
+    selected = [e for e in entries if e[0] in wanted]
+    missing = wanted - {e[0] for e in selected}
+    if missing:
+        print(f"[WARN] {len(missing)} contigs not in {table}: {', '.join(sorted(missing)[:5])}"
+              f"{' ...' if len(missing) > 5 else ''}", file=sys.stderr)
+
+    compressed = codec_of(table) is not None
+    if not compressed and entries:
+        end = entries[-1][1] + entries[-1][2]
+        if end != os.path.getsize(table):
+            raise _stale(table, f"indexed {end} bytes, file has {os.path.getsize(table)}")
+
+    position = 0
+    with open_text(table, "rb") as raw:
+        for contig, offset, length, _ in selected:
+            if compressed:
+                while position < offset:
+                    skipped = raw.read(min(_SKIP_BLOCK, offset - position))
+                    if not skipped:
+                        raise _stale(table, f"table ends before offset {offset}")
+                    position += len(skipped)
+            else:
+                raw.seek(offset)
+            data = _read_exact(raw, length).decode("utf-8")
+            position = offset + length
+            if not data.startswith(contig + "_kmer_") or not data.endswith("\n"):
+                raise _stale(table, f"no rows of {contig} at offset {offset}")
+            yield contig, data
+
+
+def scan_contigs(table, contigs):
+    """Rows of the requested contigs by a full pass over the table (no usable index)."""
+    wanted = set(contigs)
+    with open_text(table) as fh:
+        fh.readline()
+        for line in fh:
+            if _contig(line) in wanted:
+                yield line
+
+
+def select_contigs(table, ids_file, output_file):
+    """Write the header and the rows of the contigs listed in ids_file (one per line)."""
+    index = index_path(table)
+    indexed = os.path.exists(index) and os.path.getmtime(index) >= os.path.getmtime(table)
+    if not indexed:
+        print(f"[INFO] no up-to-date index for {table}, building {index}", file=sys.stderr)
+        indexed = build_index(table)
+
+    with open(ids_file) as fh:
+        contigs = [line.split()[0] for line in fh if line.strip()]
+
+    with open_text(table) as fh:
+        header = fh.readline()
+    with open_text(output_file, "w") as out:
+        out.write(header)
+        if indexed:
+            for _, rows in iter_contigs(table, contigs):
+                out.write(rows)
+        else:
+            out.writelines(scan_contigs(table, contigs))
@@ -39,6 +39,16 @@ fi
 
 mkdir -p "$FILES_DIR"
 
+# ==== COMPRESSED INTERMEDIATES (COMPRESS_INTERMEDIATES="" | gz | zst) ====
+source "$SCRIPTS_DIR/ribokast_io.sh"
+source "$SCRIPTS_DIR/ribokast.sh"
+EXT=$(rk_ext)
+
+OUT="$FILES_DIR/out$EXT"
+OUT_ID="$FILES_DIR/out_id$EXT"
+RS_PLUS="$FILES_DIR/RS+$EXT"
+KMERS_SUM="$FILES_DIR/KmersFromContigsQuerySum$EXT"
+
 # ==== KaMRaT wrapper ====
 kamrat() {
     apptainer exec -B /store:/store -B /data:/data "$SIF_FILE" kamrat "$@"
@@ -69,10 +79,74 @@ if [[ "$KAMRAT_WITHABSENT" != "0" && "$KAMRAT_WITHABSENT" != "1" ]]; then
     exit 1
 fi
 
+SCREEN_STRIDE="${SCREEN_STRIDE:-}"
+if [[ -n "$SCREEN_STRIDE" && ! "$SCREEN_STRIDE" =~ ^[1-9][0-9]*$ ]]; then
+    echo "ERROR: SCREEN_STRIDE must be empty or an integer >= 1 (got: $SCREEN_STRIDE)"
+    exit 1
+fi
+
+# FIFOs and their reader/writer jobs of the query in progress, cleaned up by
+# the EXIT trap if kamrat fails (set -e) so the jobs do not block forever
+KAMRAT_FIFOS=()
+KAMRAT_PIDS=()
+
+kamrat_query_cleanup() {
+    if [[ "${#KAMRAT_PIDS[@]}" -gt 0 ]]; then
+        kill "${KAMRAT_PIDS[@]}" 2> /dev/null || true
+    fi
+    if [[ "${#KAMRAT_FIFOS[@]}" -gt 0 ]]; then
+        rm -f "${KAMRAT_FIFOS[@]}"
+    fi
+    KAMRAT_FIFOS=()
+    KAMRAT_PIDS=()
+}
+
+descendants() {
+    local child
+    for child in $(pgrep -P "$1"); do
+        echo "$child"
+        descendants "$child"
+    done
+}
+
+# Background chunk jobs (chunked pipeline) are killed with the script too,
+# with the commands they are running (killing a subshell leaves those orphaned)
+pipeline_cleanup() {
+    kamrat_query_cleanup
+    local pid pids=()
+    for pid in $(jobs -p); do
+        pids+=( "$pid" $(descendants "$pid") )
+    done
+    if [[ "${#pids[@]}" -gt 0 ]]; then
+        kill "${pids[@]}" 2> /dev/null || true
+        wait 2> /dev/null || true
+    fi
+}
+trap pipeline_cleanup EXIT
+
 run_kamrat_query() {
     local fasta_in="$1"
     local out_file="$2"
-    local args=(query -idxdir "$INDEX_DIR" -fasta "$fasta_in" -toquery "$KAMRAT_TOQUERY" -outpath "$out_file" -counts "$KAMRAT_COUNTS")
+    local fasta_arg="$fasta_in"
+    local out_arg="$out_file"
+
+    # KaMRaT only reads/writes plain text: stream compressed files through FIFOs
+    if rk_is_compressed "$fasta_in"; then
+        fasta_arg="$FILES_DIR/.kamrat_in.$$"
+        mkfifo "$fasta_arg"
+        KAMRAT_FIFOS+=( "$fasta_arg" )
+        rk_cat "$fasta_in" > "$fasta_arg" &
+        KAMRAT_PIDS+=( $! )
+    fi
+    if rk_is_compressed "$out_file"; then
+        out_arg="$FILES_DIR/.kamrat_out.$$"
+        mkfifo "$out_arg"
+        KAMRAT_FIFOS+=( "$out_arg" )
+        rk_write "$out_file" < "$out_arg" &
+        KAMRAT_PIDS+=( $! )
+    fi
+
+    local args=(query -idxdir "$INDEX_DIR" -fasta "$fasta_arg" -toquery "$KAMRAT_TOQUERY" -outpath "$out_arg" -counts "$KAMRAT_COUNTS")
 
     if [[ "$KAMRAT_WITHABSENT" = "1" ]]; then
         args+=( -withabsent )
@@ -80,92 +154,283 @@ run_kamrat_query() {
 
     echo "[INFO] kamrat ${args[*]}"
     kamrat "${args[@]}"
+
+    # A failed (de)compression job must fail the query, not leave a truncated file
+    local pid status=0
+    for pid in "${KAMRAT_PIDS[@]}"; do
+        wait "$pid" || status=$?
+    done
+    KAMRAT_PIDS=()
+    kamrat_query_cleanup
+    if [[ "$status" -ne 0 ]]; then
+        echo "ERROR: streaming $fasta_in / $out_file through KaMRaT failed (exit status $status)" >&2
+        exit "$status"
+    fi
 }
 
 # =========================
 # 1) FIRST KaMRaT QUERY
 # =========================
-run_kamrat_query "$FASTA_FILE" "$FILES_DIR/out"
+run_kamrat_query "$FASTA_FILE" "$OUT"
 
 # ==== PROCESS OUTPUT FILE ====
-python3 "$SCRIPTS_DIR/addid.py" "$FASTA_FILE" "$FILES_DIR/out" "$FILES_DIR/out_id"
-
-# Retrieve header
-HEADER=$(head -n 1 "$FILES_DIR/out_id")
+ribokast kmers addid "$FASTA_FILE" "$OUT" "$OUT_ID"
 
-# ==== FILTER RS+ / RS- ====
-echo -e "$HEADER" > "$FILES_DIR/RS+"
-awk -F'\t' 'NR > 1 {
+# ==== FILTER RS+ / RS- (header kept) ====
+rk_cat "$OUT_ID" | awk -F'\t' 'NR == 1 { print; next } {
     sum=0
     for(i=3; i<=NF; i++) sum+=$i
     if(sum != 0) print
-}' "$FILES_DIR/out_id" >> "$FILES_DIR/RS+"
+}' | rk_write "$RS_PLUS"
 
-echo -e "$HEADER" > "$FILES_DIR/RS-"
-awk -F'\t' 'NR > 1 {
+rk_cat "$OUT_ID" | awk -F'\t' 'NR == 1 { print; next } {
     sum=0
     for(i=3; i<=NF; i++) sum+=$i
     if(sum == 0) print
-}' "$FILES_DIR/out_id" >> "$FILES_DIR/RS-"
+}' > "$FILES_DIR/RS-"
 
 # Create RS+ / RS- FASTA files
-awk 'NR > 1 {print ">"$1"\n"$2}' "$FILES_DIR/RS+" > "$FILES_DIR/RS+.fa"
+rk_cat "$RS_PLUS" | awk 'NR > 1 {print ">"$1"\n"$2}' > "$FILES_DIR/RS+.fa"
 awk 'NR > 1 {print ">"$1"\n"$2}' "$FILES_DIR/RS-" > "$FILES_DIR/RS-.fa"
 
-# ==== GENERATE KMERS ====
-python3 "$SCRIPTS_DIR/generate_kmers_fromFasta.py" "$FILES_DIR/RS+.fa" "$FILES_DIR/kmersFromContigs.fa" "$KMER_LENGTH"
+# Stage outputs (per directory: FILES_DIR, or one chunk directory in chunked mode)
+if [ "$TRANSLATE" = true ]; then
+    TESTED="KmersFromContigsQuerySumPhaseSeqTranslated"
+else
+    TESTED="KmersFromContigsQuerySumPhaseSeq"
+fi
+PVALUE="${TESTED}Pvalue"
 
-# =========================
-# 2) SECOND KaMRaT QUERY
-# =========================
-run_kamrat_query "$FILES_DIR/kmersFromContigs.fa" "$FILES_DIR/KmersFromContigsQuery"
+# ==== GENERATE KMERS + SECOND KaMRaT QUERY (<dir>/RS+.fa) ====
+# With SCREEN_STRIDE set, a first query on every SCREEN_STRIDE-th triplet of
+# k-mers calls the clear RS+P+ / RS+P- contigs (<dir>/screen_calls.tsv), and
+# only the ambiguous ones (<dir>/RS+.ambiguous.fa) get all their k-mers queried.
+query_stage() {
+    local dir="$1"
+    local contigs="$dir/RS+.fa"
 
-# ==== PHASING PREDICTION ====
-python3 "$SCRIPTS_DIR/add_id_sum.py" \
-    "$FILES_DIR/kmersFromContigs.fa" \
-    "$FILES_DIR/KmersFromContigsQuery" \
-    "$FILES_DIR/KmersFromContigsQuerySum"
+    if [[ -n "$SCREEN_STRIDE" ]]; then
+        ribokast kmers generate "$dir/RS+.fa" "$dir/kmersFromContigs.screen.fa$EXT" "$KMER_LENGTH" --stride "$SCREEN_STRIDE"
+        run_kamrat_query "$dir/kmersFromContigs.screen.fa$EXT" "$dir/KmersFromContigsQuery.screen$EXT"
+        ribokast kmers sum \
+            "$dir/kmersFromContigs.screen.fa$EXT" \
+            "$dir/KmersFromContigsQuery.screen$EXT" \
+            "$dir/KmersFromContigsQuerySum.screen$EXT" \
+            --no-index
+        ribokast phase screen \
+            "$dir/KmersFromContigsQuerySum.screen$EXT" \
+            "$dir/RS+.fa" \
+            "$dir/screen_calls.tsv" \
+            "$dir/RS+.ambiguous.fa" \
+            "$KMER_LENGTH" \
+            --stride "$SCREEN_STRIDE" \
+            --confidence "${SCREEN_CONFIDENCE:-0.999}" \
+            --min-votes "${SCREEN_MIN_VOTES:-10}"
+        contigs="$dir/RS+.ambiguous.fa"
+        rm -f "$dir/kmersFromContigs.fa$EXT" "$dir/KmersFromContigsQuery$EXT"
+        if ! grep -q '^>' "$contigs"; then
+            return
+        fi
+    fi
 
-python3 "$SCRIPTS_DIR/phaseCount.py" \
-    "$FILES_DIR/KmersFromContigsQuerySum" \
-    "$FILES_DIR/KmersFromContigsQuerySumPhase" \
-    "$PHASE_SHIFT"
+    ribokast kmers generate "$contigs" "$dir/kmersFromContigs.fa$EXT" "$KMER_LENGTH"
 
-python3 "$SCRIPTS_DIR/add_colContFromFastaFile_arg.py" \
-    "$FILES_DIR/RS+.fa" \
-    "$FILES_DIR/KmersFromContigsQuerySumPhase" \
-    "$FILES_DIR/KmersFromContigsQuerySumPhaseSeq"
+    run_kamrat_query "$dir/kmersFromContigs.fa$EXT" "$dir/KmersFromContigsQuery$EXT"
+}
 
-# ==== TRANSLATION (Only if mode is '-contig') ====
-if [ "$TRANSLATE" = true ]; then
-    "$SCRIPTS_DIR/translate_st.sh" \
-        "$FILES_DIR/KmersFromContigsQuerySumPhaseSeq" \
-        "$FILES_DIR/KmersFromContigsQuerySumPhaseSeqTranslated" \
-        "$FILES_DIR/temp_fasta" \
-        "$FILES_DIR/temp_result"
-    rm -f "$FILES_DIR/temp_result" "$FILES_DIR/temp_fasta"
-
-    # Binomial test after translation
-    python3 "$SCRIPTS_DIR/binom_test.py" \
-        "$FILES_DIR/KmersFromContigsQuerySumPhaseSeqTranslated" \
-        > "$FILES_DIR/KmersFromContigsQuerySumPhaseSeqTranslatedPvalue"
-
-    python3 "$SCRIPTS_DIR/addRSState.py" \
-        "$FILES_DIR/KmersFromContigsQuerySumPhaseSeqTranslatedPvalue" \
-        "$FILES_DIR/RS-" \
-        "$FILES_DIR/KmersFromContigsQuerySumPhaseSeqTranslatedPvalueRSState"
+# ==== PHASING PREDICTION, TRANSLATION (-contig only) AND BINOMIAL TEST ====
+downstream_stage() {
+    local dir="$1"
+
+    if [[ -n "$SCREEN_STRIDE" ]]; then
+        local full_sum=()
+        if [[ -e "$dir/KmersFromContigsQuery$EXT" ]]; then
+            ribokast kmers sum \
+                "$dir/kmersFromContigs.fa$EXT" \
+                "$dir/KmersFromContigsQuery$EXT" \
+                "$dir/KmersFromContigsQuerySum.full$EXT" \
+                --no-index
+            full_sum=( "$dir/KmersFromContigsQuerySum.full$EXT" )
+        fi
+        ribokast phase screen-merge \
+            "$dir/KmersFromContigsQuerySum.screen$EXT" \
+            "$dir/screen_calls.tsv" \
+            "$dir/KmersFromContigsQuerySum$EXT" \
+            "${full_sum[@]}"
+        rm -f "${full_sum[@]}"
+    else
+        ribokast kmers sum \
+            "$dir/kmersFromContigs.fa$EXT" \
+            "$dir/KmersFromContigsQuery$EXT" \
+            "$dir/KmersFromContigsQuerySum$EXT"
+    fi
+
+    ribokast phase count \
+        "$dir/KmersFromContigsQuerySum$EXT" \
+        "$dir/KmersFromContigsQuerySumPhase" \
+        "$PHASE_SHIFT"
+
+    ribokast phase addseq \
+        "$dir/RS+.fa" \
+        "$dir/KmersFromContigsQuerySumPhase" \
+        "$dir/KmersFromContigsQuerySumPhaseSeq"
+
+    if [ "$TRANSLATE" = true ]; then
+        "$SCRIPTS_DIR/translate_st.sh" \
+            "$dir/KmersFromContigsQuerySumPhaseSeq" \
+            "$dir/KmersFromContigsQuerySumPhaseSeqTranslated" \
+            "$dir/temp_fasta" \
+            "$dir/temp_result"
+        rm -f "$dir/temp_result" "$dir/temp_fasta"
+    fi
+
+    ribokast binom "$dir/$TESTED" \
+        --memory-mb "${BINOM_MEMORY_MB:-512}" --tmp-dir "$dir" > "$dir/$PVALUE"
+}
+
+# ==== CHUNK ASSEMBLY HELPERS ====
+# concat_chunks OUT FILE... : concatenate tables, keeping the first header only
+concat_chunks() {
+    local out="$1"
+    shift
+    {
+        rk_cat "$1"
+        shift
+        for f in "$@"; do
+            rk_cat "$f" | tail -n +2
+        done
+    } | rk_write "$out"
+}
+
+# merge_chunks OUT "SORT KEYS" FILE... : k-way merge of tables already sorted by KEYS
+merge_chunks() {
+    local out="$1"
+    local keys="$2"
+    shift 2
+    local bodies=()
+    for f in "$@"; do
+        tail -n +2 "$f" > "$f.body"
+        bodies+=( "$f.body" )
+    done
+    {
+        awk 'NR == 1' "$1"
+        # shellcheck disable=SC2086
+        LC_ALL=C sort -m -s -t $'\t' $keys "${bodies[@]}"
+    } > "$out"
+    rm -f "${bodies[@]}"
+}
+
+PIPELINE_CHUNK_SIZE="${PIPELINE_CHUNK_SIZE:-}"
+PIPELINE_JOBS="${PIPELINE_JOBS:-2}"
+
+if [[ -z "$PIPELINE_CHUNK_SIZE" ]] || ! grep -q '^>' "$FILES_DIR/RS+.fa"; then
+    query_stage "$FILES_DIR"
+    downstream_stage "$FILES_DIR"
 else
-    # Binomial test without translation
-    python3 "$SCRIPTS_DIR/binom_test.py" \
-        "$FILES_DIR/KmersFromContigsQuerySumPhaseSeq" \
-        > "$FILES_DIR/KmersFromContigsQuerySumPhaseSeqPvalue"
+    # =========================================================
+    # Chunked pipeline: RS+ contigs are split into chunks of PIPELINE_CHUNK_SIZE.
+    # The KaMRaT query of chunk N+1 runs while up to PIPELINE_JOBS earlier chunks
+    # go through sum -> phase -> translate -> test in the background; the next
+    # query waits when that many chunks are still pending (backpressure).
+    # =========================================================
+    CHUNKS_DIR="$FILES_DIR/chunks"
+    rm -rf "$CHUNKS_DIR"
+    mkdir -p "$CHUNKS_DIR"
+
+    awk -v size="$PIPELINE_CHUNK_SIZE" -v dir="$CHUNKS_DIR" '
+    /^>/ {
+        if (n % size == 0) {
+            if (out) close(out)
+            out = sprintf("%s/chunk_%06d.fa", dir, ++c)
+        }
+        n++
+    }
+    { print > out }' "$FILES_DIR/RS+.fa"
 
-    python3 "$SCRIPTS_DIR/addRSState.py" \
-        "$FILES_DIR/KmersFromContigsQuerySumPhaseSeqPvalue" \
-        "$FILES_DIR/RS-" \
-        "$FILES_DIR/KmersFromContigsQuerySumPhaseSeqPvalueRSState"
+    CHUNKS=()
+    for fa in "$CHUNKS_DIR"/chunk_*.fa; do
+        [[ -e "$fa" ]] || continue
+        chunk="${fa%.fa}"
+        mkdir -p "$chunk"
+        mv "$fa" "$chunk/RS+.fa"
+        CHUNKS+=( "$chunk" )
+    done
+    echo "[INFO] chunked pipeline: ${#CHUNKS[@]} chunks of $PIPELINE_CHUNK_SIZE contigs, $PIPELINE_JOBS concurrent jobs"
 
-    # ==== HEADER UPDATE FOR -orf MODE ====
+    # The first failed chunk stops the run; the EXIT trap kills the others
+    chunk_failed() {
+        echo "ERROR: a chunk failed (exit status $1), stopping the chunked pipeline" >&2
+        exit 1
+    }
+
+    for chunk in "${CHUNKS[@]}"; do
+        while [[ "$(jobs -rp | wc -l)" -ge "$PIPELINE_JOBS" ]]; do
+            wait -n || chunk_failed $?
+        done
+        query_stage "$chunk"
+        ( downstream_stage "$chunk"; touch "$chunk/.done" ) &
+    done
+    while [[ -n "$(jobs -rp)" ]]; do
+        wait -n || chunk_failed $?
+    done
+    wait
+
+    for chunk in "${CHUNKS[@]}"; do
+        if [[ ! -e "$chunk/.done" ]]; then
+            echo "ERROR: chunk $chunk failed"
+            exit 1
+        fi
+    done
+
+    # ==== ASSEMBLE CHUNK OUTPUTS (same order as the unchunked run) ====
+    # Sum: k-mer order of RS+.fa (index merged from the chunk indexes);
+    # Phase/Seq/Translated: contig id order
+    # (phaseCount groupby); Pvalue: p-value, ties by contig id (stable sort).
+    concat_chunks "$KMERS_SUM" "${CHUNKS[@]/%//KmersFromContigsQuerySum$EXT}"
+    ribokast kmers index "$KMERS_SUM" --chunks "${CHUNKS[@]/%//KmersFromContigsQuerySum$EXT}"
+    if [[ -n "$SCREEN_STRIDE" ]]; then
+        concat_chunks "$FILES_DIR/screen_calls.tsv" "${CHUNKS[@]/%//screen_calls.tsv}"
+    fi
+    merge_chunks "$FILES_DIR/KmersFromContigsQuerySumPhase" "-k1,1" "${CHUNKS[@]/%//KmersFromContigsQuerySumPhase}"
+    merge_chunks "$FILES_DIR/KmersFromContigsQuerySumPhaseSeq" "-k2,2" "${CHUNKS[@]/%//KmersFromContigsQuerySumPhaseSeq}"
+    if [ "$TRANSLATE" = true ]; then
+        merge_chunks "$FILES_DIR/$TESTED" "-k2,2" "${CHUNKS[@]/%//$TESTED}"
+    fi
+    PCOL=$(awk -F'\t' 'NR == 1 { print NF }' "${CHUNKS[0]}/$PVALUE")
+    merge_chunks "$FILES_DIR/$PVALUE" "-k${PCOL},${PCOL}g -k2,2" "${CHUNKS[@]/%//$PVALUE}"
+    rm -rf "$CHUNKS_DIR"
+fi
+
+# ==== FLAG TIER-1 CALLS (SCREEN_STRIDE) ====
+# Their P1/P2/P3 and p_value come from the sampled triplets only
+if [[ -n "$SCREEN_STRIDE" ]]; then
+    ribokast phase screen-mark \
+        "$FILES_DIR/$PVALUE" \
+        "$FILES_DIR/screen_calls.tsv" \
+        "$FILES_DIR/$PVALUE.marked" \
+        --stride "$SCREEN_STRIDE"
+    mv "$FILES_DIR/$PVALUE.marked" "$FILES_DIR/$PVALUE"
+fi
+
+ribokast phase rsstate \
+    "$FILES_DIR/$PVALUE" \
+    "$FILES_DIR/RS-" \
+    "$FILES_DIR/${PVALUE}RSState"
+
+# ==== SCREENING REPORT (SCREEN_STRIDE) ====
+# K-mers queried vs full mode; with SCREEN_REFERENCE (results directory of a
+# full-mode run on the same input), also the agreement of the calls.
+if [[ -n "$SCREEN_STRIDE" ]]; then
+    report_args=()
+    if [[ -n "${SCREEN_REFERENCE:-}" && -e "$SCREEN_REFERENCE/${PVALUE}RSState" ]]; then
+        report_args=( --screened "$FILES_DIR/${PVALUE}RSState" --reference "$SCREEN_REFERENCE/${PVALUE}RSState" )
+    fi
+    ribokast phase screen-report "$FILES_DIR/screen_calls.tsv" "${report_args[@]}" > "$FILES_DIR/screen_report.tsv"
+    cat "$FILES_DIR/screen_report.tsv"
+fi
+
+# ==== HEADER UPDATE FOR -orf MODE ====
+if [ "$TRANSLATE" = false ]; then
     TMP_HEADER_FILE="$FILES_DIR/tmp_header_replaced"
     awk 'NR==1 {
         printf "contigofpeptide\tpeptide";
@@ -173,7 +438,6 @@ else
         printf "\n";
         next;
     }
-    { print }' "$FILES_DIR/KmersFromContigsQuerySumPhaseSeqPvalueRSState" > "$TMP_HEADER_FILE"
-    mv "$TMP_HEADER_FILE" "$FILES_DIR/KmersFromContigsQuerySumPhaseSeqPvalueRSState"
+    { print }' "$FILES_DIR/${PVALUE}RSState" > "$TMP_HEADER_FILE"
+    mv "$TMP_HEADER_FILE" "$FILES_DIR/${PVALUE}RSState"
 fi
-
@@ -0,0 +1,12 @@
+import importlib.util
+import shutil
+
+import pytest
+
+
+@pytest.fixture(params=["", ".gz", ".zst"], ids=["plain", "gz", "zst"])
+def ext(request):
+    """Extension of an intermediate file: plain text, gzip or zstd."""
+    if request.param == ".zst" and not (shutil.which("zstd") or importlib.util.find_spec("zstandard")):
+        pytest.skip("neither the zstd CLI nor the zstandard module is available")
+    return request.param
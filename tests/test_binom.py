@@ -0,0 +1,103 @@
+"""
+Ranking by p-value: the spilling external sort and the top-k selection must
+give the rows (and the tie order) of the in-memory determine_major_phase.
+"""
+import io
+import os
+import random
+
+import pytest
+
+from ribokast import binom_test
+from ribokast.binom_test import binom, determine_major_phase, iter_ranked, iter_top_k, read_table
+
+N_ROWS = 400
+
+
+@pytest.fixture
+def table(tmp_path):
+    """Phase table whose P1/P2/P3 come from a small range, so many p-values tie."""
+    rng = random.Random(5)
+    path = tmp_path / "phase.tsv"
+    with open(path, "w") as f:
+        f.write("contig\tID_contig\tP1\tP2\tP3\tDominant_Phase\tFunctional_dominant_phase\n")
+        for i in range(N_ROWS):
+            phases = [rng.randint(0, 12) for _ in range(3)]
+            f.write(f"SEQ{i}\tctg{i}\t" + "\t".join(map(str, phases)) + "\tp1\t1\n")
+    return str(path)
+
+
+@pytest.fixture
+def expected(table):
+    return determine_major_phase(read_table(table))[1:]
+
+
+def data_lines(table):
+    with open(table) as f:
+        return f.readlines()[1:]
+
+
+def test_ranked_in_memory(table, expected, tmp_path):
+    assert list(iter_ranked(data_lines(table), tmp_dir=str(tmp_path))) == expected
+    # Ties on the p-value keep the input order
+    assert len({row[-1] for row in expected}) < N_ROWS
+
+
+def test_ranked_spilled(table, expected, tmp_path, monkeypatch):
+    monkeypatch.setattr(binom_test, "MAX_MERGE_RUNS", 3)
+    spill_dir = tmp_path / "runs"
+    spill_dir.mkdir()
+    written, open_runs, max_open = [], [0], [0]
+    write_run, read_run = binom_test._write_run, binom_test._read_run
+
+    def counting_write_run(rows, tmp_dir):
+        written.append(len(rows))
+        return write_run(rows, tmp_dir)
+
+    def counting_read_run(path):
+        open_runs[0] += 1
+        max_open[0] = max(max_open[0], open_runs[0])
+        try:
+            yield from read_run(path)
+        finally:
+            open_runs[0] -= 1
+
+    monkeypatch.setattr(binom_test, "_write_run", counting_write_run)
+    monkeypatch.setattr(binom_test, "_read_run", counting_read_run)
+
+    # ~2 KB budget: a handful of rows per sorted run
+    ranked = list(iter_ranked(data_lines(table), memory_mb=0.002, tmp_dir=str(spill_dir)))
+
+    assert ranked == expected
+    assert len(written) > 3 * binom_test.MAX_MERGE_RUNS
+    assert sum(written) == N_ROWS
+    assert max_open[0] <= binom_test.MAX_MERGE_RUNS
+    assert os.listdir(spill_dir) == []
+
+
+@pytest.mark.parametrize("k", [1, 7, 50, N_ROWS, N_ROWS + 10])
+def test_top_k(table, expected, k):
+    assert list(iter_top_k(data_lines(table), k)) == expected[:k]
+
+
+def test_top_k_cuts_through_ties(table, expected):
+    # k ending inside a run of equal p-values keeps the earliest rows of the run
+    k = next(i for i in range(1, N_ROWS) if expected[i - 1][-1] == expected[i][-1])
+    assert list(iter_top_k(data_lines(table), k)) == expected[:k]
+
+
+@pytest.mark.parametrize("top_k, memory_mb", [(None, 512), (None, 0.002), (25, 512)])
+def test_binom(table, expected, tmp_path, top_k, memory_mb):
+    out = io.StringIO()
+    binom(table, memory_mb=memory_mb, tmp_dir=str(tmp_path), top_k=top_k, out=out)
+
+    lines = out.getvalue().splitlines()
+    assert lines[0].split("\t")[-1] == "p_value"
+    assert [line.split("\t") for line in lines[1:]] == expected[:top_k]
+
+
+def test_rejects_empty_budgets(table):
+    with pytest.raises(ValueError, match="memory budget"):
+        list(iter_ranked(data_lines(table), memory_mb=0))
+    with pytest.raises(ValueError, match="top-k"):
+        list(iter_top_k(data_lines(table), 0))
@@ -0,0 +1,122 @@
+"""
+ORF query deduplication: identical ORF sequences are queried once under an
+ORF_<n> id, and the final merge fans each result back out to every contig
+and peptide it came from.
+"""
+import csv
+
+from ribokast.fasta import iter_fasta
+from ribokast.getORF import collapse, collapse_orfs, filter_by_peptide_length
+from ribokast.merge_no_ann import fan_out, index_provenance, merge_no_annotation
+from ribokast.ribokast_io import open_text
+
+# (frame, peptide, start_end, nt_sequence, contig)
+ORF_ROWS = [
+    (">ctg1_frame=1", "MKV", "1-9", "ATGAAAGTT", "ctg1"),
+    (">ctg1_frame=2", "MLW", "2-10", "ATGCTTTGG", "ctg1"),
+    (">ctg2_frame=1", "MKV", "4-12", "ATGAAAGTT", "ctg2"),
+    (">ctg3_frame=3", "MKV", "3-11", "ATGAAAGTT", "ctg3"),
+    (">ctg3_frame=1", "", "1-1", "", "ctg3"),
+    (">ctg4_frame=1", "MLW", "7-15", "ATGCTTTGG", "ctg4"),
+]
+
+
+def write_tsv(path, rows):
+    with open_text(str(path), "w") as out:
+        for row in rows:
+            out.write("\t".join(row) + "\n")
+    return str(path)
+
+
+def read_tsv(path):
+    with open_text(str(path)) as fh:
+        return [row for row in csv.reader(fh, delimiter="\t")]
+
+
+# ----------------------------
+# Collapse (orf collapse)
+# ----------------------------
+
+def test_filter_by_peptide_length():
+    mapped = {">c_frame=1": [("MK", 1, 6, "ATGAAA", "c"), ("MKVLW", 1, 15, "ATGAAAGTTCTTTGG", "c")]}
+
+    assert filter_by_peptide_length(mapped, 0) is mapped
+    assert filter_by_peptide_length(mapped, 3) == {">c_frame=1": [("MKVLW", 1, 15, "ATGAAAGTTCTTTGG", "c")]}
+
+
+def test_collapse_orfs():
+    unique, provenance = collapse_orfs(ORF_ROWS)
+
+    # One query per distinct sequence, numbered in first-seen order; empty sequences dropped
+    assert unique == [("ORF_1", "ATGAAAGTT"), ("ORF_2", "ATGCTTTGG")]
+    assert provenance == [
+        ("ORF_1", "MKV", "ATGAAAGTT", "ctg1", ">ctg1_frame=1", "1-9"),
+        ("ORF_2", "MLW", "ATGCTTTGG", "ctg1", ">ctg1_frame=2", "2-10"),
+        ("ORF_1", "MKV", "ATGAAAGTT", "ctg2", ">ctg2_frame=1", "4-12"),
+        ("ORF_1", "MKV", "ATGAAAGTT", "ctg3", ">ctg3_frame=3", "3-11"),
+        ("ORF_2", "MLW", "ATGCTTTGG", "ctg4", ">ctg4_frame=1", "7-15"),
+    ]
+
+
+def test_collapse_tables(tmp_path, ext):
+    header = ("Frame", "Peptide", "Start-End", "Sequence", "Contig")
+    tables = [write_tsv(tmp_path / f"plus.tsv{ext}", [header] + ORF_ROWS[:3]),
+              write_tsv(tmp_path / f"minus.tsv{ext}", [header] + ORF_ROWS[3:])]
+
+    collapse(str(tmp_path / f"orfs.fa{ext}"), str(tmp_path / f"provenance.tsv{ext}"), tables)
+
+    assert list(iter_fasta(str(tmp_path / f"orfs.fa{ext}"))) == [("ORF_1", "ATGAAAGTT"), ("ORF_2", "ATGCTTTGG")]
+    provenance = read_tsv(tmp_path / f"provenance.tsv{ext}")
+    assert provenance[0] == ["ORF_id", "Peptide", "Sequence", "Contig", "Frame", "Start-End"]
+    assert [(row[0], row[3]) for row in provenance[1:]] == [("ORF_1", "ctg1"), ("ORF_2", "ctg1"), ("ORF_1", "ctg2"),
+                                                            ("ORF_1", "ctg3"), ("ORF_2", "ctg4")]
+
+
+# ----------------------------
+# Fan-out (merge no_ann)
+# ----------------------------
+
+def test_index_provenance():
+    rows = [("ORF_1", "MKV", ">ctg1"), ("ORF_1", "MKV", "ctg1"), ("ORF_1", "MKV", "ctg2"),
+            ("ORF_2", " MLW ", "ctg1 "), ("ORF_3", "", "ctg5")]
+
+    assert index_provenance(rows) == {"ORF_1": [("ctg1", "MKV"), ("ctg2", "MKV")], "ORF_2": [("ctg1", "MLW")]}
+
+
+def test_fan_out():
+    header = ["contigofpeptide", "peptide", "P1", "RSState"]
+    rows = [["ATGAAAGTT", "ORF_1", "5", "RS+P+"], ["ATGCTTTGG", "ORF_2", "1", "RS+P-"],
+            ["ATGTAG", "ORF_9", "0", "RS+P-"]]
+    provenance = {"ORF_1": [("ctg1", "MKV"), ("ctg2", "MKV")], "ORF_2": [("ctg4", "MLW")]}
+
+    assert fan_out(header, rows, provenance) == [
+        ["Contig_id", "peptide", "P1", "RSState"],
+        ["ctg1", "MKV", "5", "RS+P+"],
+        ["ctg2", "MKV", "5", "RS+P+"],
+        ["ctg4", "MLW", "1", "RS+P-"],
+        # An ORF missing from the provenance table is kept, not dropped
+        ["UNKNOWN", "ORF_9", "0", "RS+P-"],
+    ]
+
+
+def test_merge_no_annotation(tmp_path):
+    _, provenance = collapse_orfs(ORF_ROWS)
+    mapping = write_tsv(tmp_path / "ORFs_provenance.tsv",
+                        [("ORF_id", "Peptide", "Sequence", "Contig", "Frame", "Start-End")] + provenance)
+    rsstate = write_tsv(tmp_path / "RSState", [("contigofpeptide", "peptide", "P1", "p_value", "RSState"),
+                                               ("ATGAAAGTT", "ORF_1", "7", "0.0001", "RS+P+"),
+                                               ("ATGCTTTGG", "ORF_2", "2", "0.6", "RS+P-")])
+    rs_minus = write_tsv(tmp_path / "contigsOfPeptides_RS-", [("Frame", "Peptide", "Start-End", "Sequence", "Contig"),
+                                                              (">ctg9_frame=1", "MQQ", "1-9", "ATGCAACAA", ">ctg9")])
+
+    merge_no_annotation(rsstate, mapping, rs_minus, str(tmp_path / "ORFs_RSState.tsv"))
+
+    assert read_tsv(tmp_path / "ORFs_RSState.tsv") == [
+        ["Contig_id", "peptide", "P1", "p_value", "RSState"],
+        ["ctg1", "MKV", "7", "0.0001", "RS+P+"],
+        ["ctg2", "MKV", "7", "0.0001", "RS+P+"],
+        ["ctg3", "MKV", "7", "0.0001", "RS+P+"],
+        ["ctg1", "MLW", "2", "0.6", "RS+P-"],
+        ["ctg4", "MLW", "2", "0.6", "RS+P-"],
+        ["ctg9", "MQQ", "NA", "NA", "RS-"],
+    ]
@@ -0,0 +1,141 @@
+"""
+Compressed intermediates: open_text round trips over plain, gz and zst (CLI
+tools and Python modules), and the k-mer steps reading and writing them.
+"""
+import gzip
+import importlib.util
+
+import pytest
+
+from ribokast import ribokast_io
+from ribokast.add_id_sum import add_id_sum
+from ribokast.addid import add_ids
+from ribokast.fasta import iter_fasta
+from ribokast.generate_kmers_fromFasta import generate_kmers, generate_kmers_from_fasta
+from ribokast.ribokast_io import codec_of, open_text
+from ribokast.sum_index import read_index
+
+LINES = [f"ctg{i}_kmer_{i}\tACGTTGCA\t{i}.5\t{i * 2}\n" for i in range(2000)]
+CONTIGS = [("ctg1", "ATGAAAGTTCTTTGGTAA"), ("ctg2", "ATGCAACAATGA"), ("ctg3", "ATGTTTGGCCCAAAGGGTTTTAG")]
+
+
+def write_lines(path, lines):
+    with open_text(str(path), "w") as out:
+        out.writelines(lines)
+    return str(path)
+
+
+def read_lines(path):
+    with open_text(str(path)) as fh:
+        return fh.readlines()
+
+
+# ----------------------------
+# open_text
+# ----------------------------
+
+def test_codec_of():
+    assert [codec_of(p) for p in ("a.tsv", "a.fa.gz", "a.zst", "a.gz.tsv")] == [None, "gz", "zst", None]
+
+
+def test_text_round_trip(tmp_path, ext):
+    path = write_lines(tmp_path / f"table{ext}", LINES)
+
+    assert read_lines(path) == LINES
+    with open_text(path) as fh:
+        assert fh.readline() == LINES[0]
+        assert list(fh) == LINES[1:]
+
+
+def test_binary_round_trip(tmp_path, ext):
+    data = [line.encode("utf-8") for line in LINES]
+    path = str(tmp_path / f"table{ext}")
+    with open_text(path, "wb") as out:
+        out.writelines(data)
+
+    with open_text(path, "rb") as fh:
+        assert fh.readline() == data[0]
+        assert list(fh) == data[1:]
+    assert read_lines(path) == LINES
+
+
+def test_compressed_on_disk(tmp_path):
+    path = write_lines(tmp_path / "table.gz", LINES)
+    with gzip.open(path, "rt") as fh:
+        assert fh.readlines() == LINES
+
+    if ribokast_io._command("zst", reading=False) or importlib.util.find_spec("zstandard"):
+        path = write_lines(tmp_path / "table.zst", LINES)
+        with open(path, "rb") as fh:
+            assert fh.read(4) == b"\x28\xb5\x2f\xfd"  # zstd frame magic
+
+
+def test_python_modules(tmp_path, ext, monkeypatch):
+    if ext == ".zst" and not importlib.util.find_spec("zstandard"):
+        pytest.skip("zstandard module not installed")
+    cli_path = write_lines(tmp_path / f"cli{ext}", LINES)
+    monkeypatch.setattr(ribokast_io, "_command", lambda codec, reading: None)
+
+    # Files written by the CLI tools and by the modules are interchangeable
+    assert read_lines(cli_path) == LINES
+    assert read_lines(write_lines(tmp_path / f"module{ext}", LINES)) == LINES
+
+
+def test_reader_closed_early(tmp_path, ext):
+    path = write_lines(tmp_path / f"table{ext}", LINES * 20)
+
+    with open_text(path) as fh:
+        assert fh.readline() == LINES[0]
+
+
+@pytest.mark.parametrize("ext", [".gz", ".zst"])
+def test_corrupt_input_fails(tmp_path, ext):
+    if ext == ".zst" and not ribokast_io._command("zst", reading=True):
+        pytest.skip("zstd CLI not on PATH")
+    path = tmp_path / f"table{ext}"
+    path.write_bytes(b"not a compressed stream\n" * 10)
+
+    with pytest.raises(OSError):
+        read_lines(path)
+
+
+# ----------------------------
+# k-mer steps over compressed files
+# ----------------------------
+
+def test_generate_kmers(tmp_path, ext):
+    fasta = write_lines(tmp_path / f"RS+.fa{ext}", [f">{cid}\n{seq}\n" for cid, seq in CONTIGS])
+
+    generate_kmers_from_fasta(fasta, str(tmp_path / f"kmers.fa{ext}"), 12)
+
+    assert list(iter_fasta(str(tmp_path / f"kmers.fa{ext}"))) == [
+        (f"{cid}_kmer_{i}", kmer) for cid, seq in CONTIGS for i, kmer in enumerate(generate_kmers(seq, 12), start=1)]
+
+
+def test_add_ids(tmp_path, ext):
+    fasta = write_lines(tmp_path / f"contigs.fa{ext}", [f">{cid}\n{seq}\n" for cid, seq in CONTIGS])
+    rows = [f"{seq}\t{n}.0\t0.0\n" for n, (_, seq) in enumerate(CONTIGS)]
+    table = write_lines(tmp_path / f"out{ext}", ["tag\ts1\ts2\n"] + rows)
+
+    add_ids(fasta, table, str(tmp_path / f"out_id{ext}"))
+
+    assert read_lines(tmp_path / f"out_id{ext}") == ["ID\ttag\ts1\ts2\n"] + [
+        f"{cid}\t{seq}\t{n}.0\t0.0\n" for n, (cid, seq) in enumerate(CONTIGS)]
+
+
+def test_add_id_sum(tmp_path, ext):
+    kmers = [(f"{cid}_kmer_{i}", kmer) for cid, seq in CONTIGS for i, kmer in enumerate(generate_kmers(seq, 12), 1)]
+    fasta = write_lines(tmp_path / f"kmers.fa{ext}", [f">{kid}\n{kmer}\n" for kid, kmer in kmers])
+    rows = [f"{kmer}\t{i}.0\t1.5\n" for i, (_, kmer) in enumerate(kmers)]
+    query = write_lines(tmp_path / f"query{ext}", ["tag\ts1\ts2\n"] + rows)
+    plain = str(tmp_path / "sum_plain")
+    add_id_sum(str(tmp_path / f"kmers.fa{ext}"), query, plain)
+
+    add_id_sum(fasta, query, str(tmp_path / f"sum{ext}"))
+
+    lines = read_lines(tmp_path / f"sum{ext}")
+    assert lines[0] == "id\ttag\ts1\ts2\tsum\n"
+    assert lines[1:] == [f"{kid}\t{kmer}\t{i}.0\t1.5\t{i + 1.5}\n" for i, (kid, kmer) in enumerate(kmers)]
+    # The index refers to the decompressed text, so it matches the plain table's
+    assert lines == read_lines(plain)
+    assert read_index(str(tmp_path / f"sum{ext}")) == read_index(plain)
@@ -0,0 +1,250 @@
+"""
+Service mode against the in-memory table backend: /score must give the
+tables of the batch pipeline for the same contigs, /health the queue state,
+and a full queue a 503.
+"""
+import http.client
+import json
+import os
+import random
+import shutil
+import subprocess
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from ribokast.addRSState import add_rs_state
+from ribokast.add_colContFromFastaFile_arg import add_contig_column
+from ribokast.add_id_sum import add_id_sum
+from ribokast.addid import add_ids
+from ribokast.binom_test import binom
+from ribokast.fasta import iter_fasta
+from ribokast.generate_kmers_fromFasta import generate_kmers, generate_kmers_from_fasta
+from ribokast.merge_no_ann import merge_no_annotation
+from ribokast.phaseCount import phase_count
+from ribokast.ribokast_server import (RequestHandler, RiboKastScorer, RiboKastService, TableBackend, to_tsv,
+                                      write_fasta)
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+K = 12
+
+needs_seqkit = pytest.mark.skipif(shutil.which("seqkit") is None, reason="seqkit not on PATH")
+
+
+# ----------------------------
+# Fixtures
+# ----------------------------
+
+@pytest.fixture
+def contigs():
+    """Phased (RS+P+), unphased (RS+P-) and absent (RS-) contigs, in that order."""
+    rng = random.Random(7)
+    return [(f"ctg{i}", "".join(rng.choice("ACGT") for _ in range(rng.randrange(150, 240, 3))))
+            for i in range(12)]
+
+
+@pytest.fixture
+def kmer_table(tmp_path, contigs):
+    """KaMRaT-style count table (tag, s1, s2) covering the k-mers of the first 8 contigs."""
+    rng = random.Random(11)
+    counts = {}
+    for n, (_, seq) in enumerate(contigs[:8]):
+        for i, kmer in enumerate(generate_kmers(seq, K)):
+            if n < 4:
+                # Ribosome footprints: the k-mer starting each codon dominates
+                value = 20.0 if i % 3 == 0 else float(rng.randint(0, 2))
+            else:
+                value = float(rng.randint(1, 6))
+            counts[kmer] = [value, value / 2]
+    path = tmp_path / "table.tsv"
+    with open(path, "w") as f:
+        f.write("tag\ts1\ts2\n")
+        for kmer, values in counts.items():
+            f.write(kmer + "\t" + "\t".join(repr(v) for v in values) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def scorer(kmer_table, tmp_path):
+    return RiboKastScorer(TableBackend(kmer_table), K, "0", peptide_len_min=9, tmp_dir=str(tmp_path))
+
+
+@pytest.fixture
+def server(scorer):
+    """HTTP service on a free port; yields (RiboKastService, port)."""
+    service = RiboKastService(scorer, workers=1, queue_size=1, max_body=4096)
+    handler = type("Handler", (RequestHandler,), {"service": service, "log_message": lambda *args: None})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield service, httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+    service.pool.shutdown()
+
+
+# ----------------------------
+# Batch pipeline with the table backend standing in for `kamrat query`
+# ----------------------------
+
+def kamrat_query(backend, fasta_in, out_file):
+    records = list(iter_fasta(fasta_in))
+    samples, values = backend.query(records)
+    with open(out_file, "w") as f:
+        f.write("tag\t" + "\t".join(samples) + "\n")
+        for (_, seq), row in zip(records, values):
+            f.write(seq + "\t" + "\t".join(repr(v) for v in row) + "\n")
+
+
+def run_ribokast(backend, fasta_in, files_dir, translate):
+    """run_RiboKast.sh -contig|-orf, unchunked and unscreened."""
+    d = str(files_dir)
+    os.makedirs(d, exist_ok=True)
+    kamrat_query(backend, fasta_in, f"{d}/out")
+    add_ids(fasta_in, f"{d}/out", f"{d}/out_id")
+
+    with open(f"{d}/out_id") as f, open(f"{d}/RS+", "w") as plus, open(f"{d}/RS-", "w") as minus:
+        header = f.readline()
+        plus.write(header)
+        minus.write(header)
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            (plus if sum(float(v) for v in fields[2:]) != 0 else minus).write(line)
+    for name in ("RS+", "RS-"):
+        with open(f"{d}/{name}") as f:
+            f.readline()
+            write_fasta([line.split("\t")[:2] for line in f], f"{d}/{name}.fa")
+
+    generate_kmers_from_fasta(f"{d}/RS+.fa", f"{d}/kmersFromContigs.fa", K)
+    kamrat_query(backend, f"{d}/kmersFromContigs.fa", f"{d}/KmersFromContigsQuery")
+    add_id_sum(f"{d}/kmersFromContigs.fa", f"{d}/KmersFromContigsQuery", f"{d}/KmersFromContigsQuerySum")
+    phase_count(f"{d}/KmersFromContigsQuerySum", f"{d}/KmersFromContigsQuerySumPhase", "0")
+    add_contig_column(f"{d}/RS+.fa", f"{d}/KmersFromContigsQuerySumPhase", f"{d}/KmersFromContigsQuerySumPhaseSeq")
+    tested = "KmersFromContigsQuerySumPhaseSeq"
+    if translate:
+        subprocess.run([f"{REPO}/SCRIPTS/translate_st.sh", f"{d}/{tested}", f"{d}/{tested}Translated",
+                        f"{d}/temp_fasta", f"{d}/temp_result"], check=True, stdout=subprocess.DEVNULL)
+        tested += "Translated"
+    with open(f"{d}/{tested}Pvalue", "w") as out:
+        binom(f"{d}/{tested}", out=out)
+    add_rs_state(f"{d}/{tested}Pvalue", f"{d}/RS-", f"{d}/{tested}PvalueRSState")
+    return f"{d}/{tested}PvalueRSState"
+
+
+def read_text(path):
+    with open(path) as f:
+        return f.read()
+
+
+def post(port, body, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    conn.request("POST", "/score", body=body, headers=headers or {})
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    return response.status, payload
+
+
+# ----------------------------
+# Tests
+# ----------------------------
+
+def test_rs_state_matches_pipeline(tmp_path, contigs, scorer):
+    write_fasta(contigs, tmp_path / "contigs.fa")
+    expected = run_ribokast(scorer.backend, str(tmp_path / "contigs.fa"), tmp_path / "batch", translate=False)
+
+    header, rows = scorer.rs_state(contigs, False, str(tmp_path))
+
+    assert to_tsv(header, rows) == read_text(expected)
+    assert {row[-1] for row in rows} == {"RS+P+", "RS+P-", "RS-"}
+
+
+@needs_seqkit
+def test_score_matches_pipeline(tmp_path, contigs, scorer):
+    write_fasta(contigs, tmp_path / "contigs.fa")
+    contigs_dir = tmp_path / "RESULTS_CONTIGS"
+    rsstate = run_ribokast(scorer.backend, str(tmp_path / "contigs.fa"), contigs_dir, translate=True)
+    subprocess.run([f"{REPO}/ORFpred.sh", str(contigs_dir), f"{REPO}/SCRIPTS", "9"], check=True,
+                   stdout=subprocess.DEVNULL)
+    orf_rsstate = run_ribokast(scorer.backend, str(contigs_dir / "All_contig_of_peptides.fa"),
+                               contigs_dir / "RESULTS_ORFs", translate=False)
+    merge_no_annotation(orf_rsstate, str(contigs_dir / "ORFs_provenance.tsv"),
+                        str(contigs_dir / "contigsOfPeptides_RS-"), str(tmp_path / "ORFs_RSState.tsv"))
+
+    contig_header, contig_rows, orf_header, orf_rows = scorer.score(contigs)
+
+    assert to_tsv(contig_header, contig_rows) == read_text(rsstate)
+    assert to_tsv(orf_header, orf_rows) == read_text(tmp_path / "ORFs_RSState.tsv").replace("\r\n", "\n")
+    assert orf_rows
+
+
+@needs_seqkit
+def test_score_over_http(server, contigs, scorer):
+    _, port = server
+    body = "".join(f">{rid}\n{seq}\n" for rid, seq in contigs[:6])
+
+    status, payload = post(port, body)
+
+    contig_header, contig_rows, orf_header, orf_rows = scorer.score(contigs[:6])
+    assert status == 200
+    assert payload["n_contigs"] == 6
+    assert payload["rsstate"] == to_tsv(contig_header, contig_rows)
+    assert payload["orfs"] == to_tsv(orf_header, orf_rows)
+
+
+def test_health(server):
+    service, port = server
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/health")
+    response = conn.getresponse()
+
+    assert response.status == 200
+    assert json.loads(response.read()) == {"status": "ok", "workers": 1, "queue_size": 1, "pending": 0, "done": 0}
+    conn.close()
+
+
+def test_score_queue_full(server, contigs):
+    service, port = server
+    # Every worker and queue slot taken by batches in flight
+    for _ in range(service.workers + service.queue_size):
+        service.slots.acquire()
+    try:
+        status, payload = post(port, f">{contigs[0][0]}\n{contigs[0][1]}\n")
+    finally:
+        for _ in range(service.workers + service.queue_size):
+            service.slots.release()
+
+    assert status == 503
+    assert "queue full" in payload["error"]
+    assert service.status()["done"] == 0
+
+
+def test_score_rejects_large_body(server):
+    _, port = server
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    # Only the announced length is checked: the body is never read
+    conn.putrequest("POST", "/score")
+    conn.putheader("Content-Length", str(10 ** 9))
+    conn.endheaders()
+    response = conn.getresponse()
+
+    assert response.status == 413
+    assert "limit is 4096" in json.loads(response.read())["error"]
+    conn.close()
+
+
+@pytest.mark.parametrize("body, error", [
+    (b"no records here", "empty or invalid FASTA"),
+    (b">\nACGTACGTACGTACGT\n", "without an id"),
+    (b">ctg1\nACGTACGTACGT\n>ctg1\nTTTTGGGGCCCC\n", "duplicate id ctg1"),
+    (b">ctg1\n>ctg2\nACGTACGTACGT\n", "ctg1 has no sequence"),
+    (b">ctg1\nACGT\xff\xfeACGT\n", "not UTF-8"),
+])
+def test_score_rejects_bad_fasta(server, body, error):
+    service, port = server
+    status, payload = post(port, body)
+
+    assert status == 400
+    assert error in payload["error"]
+    assert service.status()["done"] == 0
@@ -0,0 +1,161 @@
+"""
+Two-tier screening: contig calls from the sampled triplet votes, the tier-2
+FASTA of the ambiguous contigs and the merged sum table of a screened run.
+"""
+import pytest
+
+from ribokast.fasta import read_fasta
+from ribokast.generate_kmers_fromFasta import in_sampled_triplet
+from ribokast.screen import (AMBIGUOUS, CALLS_HEADER, call_contig, mark_screened, merge_sums, screen,
+                             triplet_votes, wilson_interval)
+from ribokast.sum_index import read_index
+
+K = 12
+HEADER = "id\ts1\ts2\tsum\n"
+
+
+def sum_rows(contig, phases, stride=1):
+    """
+    Sum table rows of a contig whose triplet t votes for phases[t] (0-2, or
+    None for an all-zero triplet), keeping the sampled triplets only.
+    """
+    lines = []
+    for t, phase in enumerate(phases):
+        for offset in range(3):
+            i = 3 * t + offset + 1
+            if not in_sampled_triplet(i, stride):
+                continue
+            value = 0.0 if phase is None else (9.0 if offset == phase else 1.0)
+            lines.append(f"{contig}_kmer_{i}\t{value}\t0.0\t{value}\n")
+    return lines
+
+
+def write_lines(path, lines):
+    with open(path, "w") as f:
+        f.writelines(lines)
+    return str(path)
+
+
+def read_table(path):
+    with open(path) as f:
+        return [line.rstrip("\n").split("\t") for line in f]
+
+
+def write_calls(path, calls):
+    """Calls table with only the contig and call columns filled in."""
+    lines = ["\t".join(CALLS_HEADER) + "\n"]
+    lines += ["\t".join([contig] + ["0"] * (len(CALLS_HEADER) - 2) + [call]) + "\n" for contig, call in calls]
+    return write_lines(path, lines)
+
+
+# ----------------------------
+# Votes and calls
+# ----------------------------
+
+def test_triplet_votes():
+    rows = [line.rstrip("\n").split("\t") for line in sum_rows("c", [0, 1, None, 2, 1])]
+    # Ties go to the first k-mer of the triplet, as in phaseCount
+    rows += [["c_kmer_16", "4.0", "0.0", "4.0"], ["c_kmer_17", "4.0", "0.0", "4.0"],
+             ["c_kmer_18", "1.0", "0.0", "1.0"]]
+
+    assert triplet_votes(rows) == [2, 2, 1]
+
+
+def test_triplet_votes_sampled():
+    # Stride 2 keeps triplets 0, 2, 4 under their original k-mer numbers
+    lines = sum_rows("c", [0, 1, 0, 1, 2], stride=2)
+
+    assert [line.split("\t")[0] for line in lines][:4] == ["c_kmer_1", "c_kmer_2", "c_kmer_3", "c_kmer_7"]
+    assert triplet_votes(line.rstrip("\n").split("\t") for line in lines) == [2, 0, 1]
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(8, 10, 1.96)
+
+    assert low == pytest.approx(0.4902, abs=1e-4)
+    assert high == pytest.approx(0.9433, abs=1e-4)
+
+
+@pytest.mark.parametrize("votes, n_kmers, stride, confidence, expected", [
+    # Nearly all votes on one phase, extrapolated to 86 full-mode triplets
+    ([40, 2, 1], 258, 2, 0.999, ("86", "0.0000", "0.0000", "0.0000", "RS+P+")),
+    # Even the upper bound of the major fraction is not significant
+    ([14, 14, 14], 126, 1, 0.8, ("42", "1.0000", "0.3294", "1.0000", "RS+P-")),
+    # Same votes, wider interval: the call is left to tier 2
+    ([14, 14, 14], 126, 1, 0.999, ("42", "1.0000", "0.0016", "1.0000", AMBIGUOUS)),
+    # Significant once extrapolated, but not on the sampled votes themselves
+    ([7, 3, 2], 720, 20, 0.5, ("240", "0.1204", "0.0000", "0.0000", AMBIGUOUS)),
+])
+def test_call_contig(votes, n_kmers, stride, confidence, expected):
+    assert call_contig(votes, n_kmers, stride, confidence) == expected
+
+
+@pytest.mark.parametrize("votes, n_kmers", [
+    ([9, 0, 0], 300),  # fewer than min_votes sampled votes
+    ([0, 0, 0], 0),    # contig shorter than k
+])
+def test_call_contig_too_few_votes(votes, n_kmers):
+    assert call_contig(votes, n_kmers, 1, min_votes=10)[2:] == ("NA", "NA", AMBIGUOUS)
+
+
+# ----------------------------
+# Tier 1 -> tier 2
+# ----------------------------
+
+def test_screen(tmp_path, capsys):
+    # 60 triplets per full-length contig, every 2nd one queried
+    length = 3 * 60 + K - 1
+    contigs = {"phased": "A" * length, "short": "C" * (K - 4), "mixed": "G" * length, "absent": "T" * length}
+    write_lines(tmp_path / "RS+.fa", [f">{c}\n{s}\n" for c, s in contigs.items()])
+    mixed = [0, 1, 2, 0, 1, 2, 0, 1, 0, 2] * 6
+    write_lines(tmp_path / "sum", [HEADER] + sum_rows("phased", [0] * 60, stride=2)
+                + sum_rows("mixed", mixed, stride=2))
+
+    screen(str(tmp_path / "sum"), str(tmp_path / "RS+.fa"), str(tmp_path / "calls"), str(tmp_path / "ambiguous.fa"),
+           K, stride=2)
+
+    calls = read_table(tmp_path / "calls")
+    assert calls[0] == CALLS_HEADER
+    assert [row[:6] for row in calls[1:]] == [["phased", "180", "90", "30", "0", "0"],
+                                              ["short", "0", "0", "0", "0", "0"],
+                                              ["mixed", "180", "90", "18", "6", "6"],
+                                              ["absent", "180", "90", "0", "0", "0"]]
+    assert [row[-1] for row in calls[1:]] == ["RS+P+", AMBIGUOUS, AMBIGUOUS, AMBIGUOUS]
+    assert read_fasta(str(tmp_path / "ambiguous.fa")) == {c: contigs[c] for c in ("short", "mixed", "absent")}
+    assert "1 RS+P+, 0 RS+P- called from sampled triplets, 3 ambiguous" in capsys.readouterr().out
+
+
+def test_merge_sums_keeps_tier1_order(tmp_path):
+    screen_sum = write_lines(tmp_path / "screen_sum", [HEADER] + sum_rows("a", [0] * 4, stride=2)
+                             + sum_rows("b", [1] * 4, stride=2) + sum_rows("c", [2] * 4, stride=2)
+                             + sum_rows("d", [0, 1] * 2, stride=2))
+    calls = write_calls(tmp_path / "calls", [("a", "RS+P+"), ("b", AMBIGUOUS), ("c", "RS+P-"), ("d", AMBIGUOUS)])
+    full_sum = write_lines(tmp_path / "full_sum", [HEADER] + sum_rows("b", [1] * 4) + sum_rows("d", [0, 1] * 2))
+
+    merge_sums(screen_sum, calls, str(tmp_path / "merged"), full_sum)
+
+    with open(tmp_path / "merged") as f:
+        merged = f.readlines()
+    assert merged == ([HEADER] + sum_rows("a", [0] * 4, stride=2) + sum_rows("b", [1] * 4)
+                      + sum_rows("c", [2] * 4, stride=2) + sum_rows("d", [0, 1] * 2))
+    assert [entry[0] for entry in read_index(str(tmp_path / "merged"))] == ["a", "b", "c", "d"]
+
+
+def test_merge_sums_rejects_out_of_order_tier2(tmp_path):
+    screen_sum = write_lines(tmp_path / "screen_sum", [HEADER] + sum_rows("a", [0] * 2) + sum_rows("b", [1] * 2))
+    calls = write_calls(tmp_path / "calls", [("a", AMBIGUOUS), ("b", AMBIGUOUS)])
+    full_sum = write_lines(tmp_path / "full_sum", [HEADER] + sum_rows("b", [1] * 2) + sum_rows("a", [0] * 2))
+
+    with pytest.raises(ValueError, match="expected rows of a, got b"):
+        merge_sums(screen_sum, calls, str(tmp_path / "merged"), full_sum)
+
+
+def test_mark_screened(tmp_path):
+    table = write_lines(tmp_path / "pvalue", ["contig\tid\tP1\tp_value\n", "AAA\ta\t5\t0.01\n", "CCC\tb\t2\t0.5\n"])
+    calls = write_calls(tmp_path / "calls", [("a", "RS+P+"), ("b", AMBIGUOUS)])
+
+    mark_screened(table, calls, str(tmp_path / "marked"), 4)
+
+    assert read_table(tmp_path / "marked") == [["contig", "id", "P1", "p_value", "screened", "screen_stride"],
+                                               ["AAA", "a", "5", "0.01", "yes", "4"],
+                                               ["CCC", "b", "2", "0.5", "no", "1"]]
@@ -0,0 +1,187 @@
+"""
+Sidecar .idx of KmersFromContigsQuerySum tables: building it (whole table,
+while writing, from chunk indexes), and `kmers select` with and without a
+usable index.
+"""
+import os
+
+import pytest
+
+from ribokast.ribokast_io import open_text
+from ribokast.sum_index import (SumIndexBuilder, build_index, index_path, iter_contigs, merge_chunk_indexes,
+                                read_index, select_contigs)
+
+HEADER = "id\ttag\ts1\ts2\tsum\n"
+
+
+def sum_lines(contig, n, first=1):
+    return [f"{contig}_kmer_{i}\tACGTACGTACGT\t{i}.0\t0.5\t{i + 0.5}\n" for i in range(first, first + n)]
+
+
+ROWS = {"ctg1": sum_lines("ctg1", 4), "ctg2": sum_lines("ctg2", 1), "ctg10": sum_lines("ctg10", 6),
+        "ctg3": sum_lines("ctg3", 3)}
+
+
+def write_table(path, lines, header=HEADER):
+    with open_text(str(path), "w") as out:
+        out.write(header)
+        out.writelines(lines)
+    return str(path)
+
+
+def read_lines(path):
+    with open_text(str(path)) as fh:
+        return fh.readlines()
+
+
+def write_ids(path, ids):
+    with open(path, "w") as fh:
+        fh.write("".join(f"{i}\n" for i in ids))
+    return str(path)
+
+
+def make_older(path, seconds=10):
+    mtime = os.path.getmtime(path) - seconds
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def table(tmp_path, ext):
+    return write_table(tmp_path / f"sum{ext}", [line for lines in ROWS.values() for line in lines])
+
+
+# ----------------------------
+# Building the index
+# ----------------------------
+
+def test_build_index(table):
+    assert build_index(table)
+
+    entries = read_index(table)
+    assert [(contig, rows) for contig, _, _, rows in entries] == [(c, len(lines)) for c, lines in ROWS.items()]
+    # Offsets and lengths refer to the decompressed text
+    text = "".join(read_lines(table)).encode("utf-8")
+    for contig, offset, length, _ in entries:
+        assert text[offset:offset + length].decode("utf-8") == "".join(ROWS[contig])
+
+
+def test_builder_while_writing(tmp_path, table):
+    builder = SumIndexBuilder()
+    builder.add_header(HEADER)
+    for lines in ROWS.values():
+        for line in lines:
+            builder.add(line)
+    written = str(tmp_path / "written.tsv")
+    assert builder.write(written)
+
+    build_index(table)
+    assert read_index(written) == read_index(table)
+
+
+def test_split_contig_is_not_indexed(tmp_path, capsys):
+    table = write_table(tmp_path / "sum.tsv", ROWS["ctg1"][:2] + ROWS["ctg2"] + ROWS["ctg1"][2:])
+    # A stale index from an earlier run is removed rather than left behind
+    with open(index_path(table), "w") as fh:
+        fh.write("contig\toffset\tlength\trows\nctg1\t0\t1\t1\n")
+
+    assert not build_index(table)
+    assert not os.path.exists(index_path(table))
+    assert "rows of ctg1 are not contiguous" in capsys.readouterr().err
+
+
+def test_merge_chunk_indexes(tmp_path, ext):
+    # ctg10 spans the two chunks: its entries are merged into one
+    chunks = [ROWS["ctg1"] + ROWS["ctg2"] + ROWS["ctg10"][:2], ROWS["ctg10"][2:] + ROWS["ctg3"]]
+    chunk_tables = [write_table(tmp_path / f"chunk{n}{ext}", lines) for n, lines in enumerate(chunks)]
+    for chunk in chunk_tables:
+        build_index(chunk)
+    table = write_table(tmp_path / f"sum{ext}", chunks[0] + chunks[1])
+
+    assert merge_chunk_indexes(table, chunk_tables)
+
+    merged = read_index(table)
+    build_index(table)
+    assert merged == read_index(table)
+    assert [contig for contig, _, _, _ in merged] == list(ROWS)
+
+
+def test_merge_chunk_indexes_without_chunk_index(tmp_path, capsys):
+    chunk_tables = [write_table(tmp_path / "chunk0.tsv", ROWS["ctg1"]),
+                    write_table(tmp_path / "chunk1.tsv", ROWS["ctg2"])]
+    build_index(chunk_tables[0])
+    table = write_table(tmp_path / "sum.tsv", ROWS["ctg1"] + ROWS["ctg2"])
+
+    assert not merge_chunk_indexes(table, chunk_tables)
+    assert not os.path.exists(index_path(table))
+    assert "chunk1.tsv has no index" in capsys.readouterr().err
+
+
+# ----------------------------
+# Selecting contigs
+# ----------------------------
+
+def test_select_with_index(tmp_path, table, capsys):
+    build_index(table)
+    out = tmp_path / "selected.tsv"
+
+    select_contigs(table, write_ids(tmp_path / "ids", ["ctg3", "ctg1", "missing"]), str(out))
+
+    # Rows come in table order, whatever the order of the ids
+    assert read_lines(out) == [HEADER] + ROWS["ctg1"] + ROWS["ctg3"]
+    err = capsys.readouterr().err
+    assert "1 contigs not in" in err and "building" not in err
+
+
+def test_select_builds_missing_index(tmp_path, table, capsys):
+    out = tmp_path / "selected.tsv"
+
+    select_contigs(table, write_ids(tmp_path / "ids", ["ctg10", "ctg2"]), str(out))
+
+    assert read_lines(out) == [HEADER] + ROWS["ctg2"] + ROWS["ctg10"]
+    assert os.path.exists(index_path(table))
+    assert "no up-to-date index" in capsys.readouterr().err
+
+
+def test_select_rebuilds_outdated_index(tmp_path, ext):
+    table = write_table(tmp_path / f"sum{ext}", ROWS["ctg1"] + ROWS["ctg2"])
+    build_index(table)
+    make_older(index_path(table))
+    write_table(table, ROWS["ctg3"] + ROWS["ctg2"] + ROWS["ctg1"])
+    out = tmp_path / "selected.tsv"
+
+    select_contigs(table, write_ids(tmp_path / "ids", ["ctg1"]), str(out))
+
+    assert read_lines(out) == [HEADER] + ROWS["ctg1"]
+    assert [contig for contig, _, _, _ in read_index(table)] == ["ctg3", "ctg2", "ctg1"]
+
+
+def test_select_scans_unindexable_table(tmp_path, capsys):
+    lines = ROWS["ctg1"][:2] + ROWS["ctg2"] + ROWS["ctg1"][2:]
+    table = write_table(tmp_path / "sum.tsv", lines)
+    out = tmp_path / "selected.tsv"
+
+    select_contigs(table, write_ids(tmp_path / "ids", ["ctg1"]), str(out))
+
+    assert read_lines(out) == [HEADER] + ROWS["ctg1"]
+    assert "will scan it" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("ext", [""], ids=["plain"])
+def test_stale_index_size(tmp_path, table):
+    build_index(table)
+    with open(table, "a") as fh:
+        fh.writelines(sum_lines("ctg4", 2))
+
+    with pytest.raises(ValueError, match="does not match"):
+        list(iter_contigs(table, ["ctg1"]))
+
+
+def test_stale_index_offsets(tmp_path, table):
+    build_index(table)
+    index = index_path(table)
+    # Same size, different layout: the recorded offset now points into ctg1
+    write_table(table, ROWS["ctg2"] + ROWS["ctg1"] + ROWS["ctg10"] + ROWS["ctg3"])
+    os.utime(index)
+
+    with pytest.raises(ValueError, match="no rows of ctg2"):
+        list(iter_contigs(table, ["ctg2"]))